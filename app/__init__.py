@@ -20,6 +20,10 @@ def create_app(config_object=None):
         app.config.from_pyfile('../config.py')
     
     
+    # jsonify() understands Decimal, dates and enums, via orjson when installed
+    from .json_provider import FastJSONProvider
+    app.json = FastJSONProvider(app)
+
     #   cross site request forgery
     CSRFProtect(app)
     
@@ -40,5 +44,16 @@ def create_app(config_object=None):
     # import here to avoid circular import
     from .routes import main
     app.register_blueprint(main)
+
+    # session events that keep monthly_rollup current, and its CLI
+    from . import rollup
+    from .commands import rollup_cli, forecast_cli
+    app.cli.add_command(rollup_cli)
+    app.cli.add_command(forecast_cli)
+
+    # per-user data versions and the result cache keyed on them
+    from . import versions
+    from .cache import init_cache
+    init_cache(app)
         
     return app
\ No newline at end of file
@@ -0,0 +1,244 @@
+"""
+Versioned result cache for the dashboard and analytics endpoints.
+
+Keys are (endpoint, viewed user id, params, user data version), see
+app/versions.py: a write to the user's data bumps the version, so cached
+results are never invalidated explicitly, the stale ones just age out.
+
+Two backends, picked with CACHE_BACKEND:
+
+  memory   in-process LRU, evicting least-recently-used entries once the
+           pickled values exceed CACHE_MAX_BYTES
+  file     one pickle per entry under CACHE_DIR, shared by every worker
+           process on the host (point it at /dev/shm for a RAM-backed cache)
+  none     caching disabled
+
+Each backend counts its hits and misses (per process).
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+
+from flask import current_app
+
+from .versions import data_version
+
+DEFAULT_MAX_BYTES = 64 * 2**20
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits   = 0
+        self.misses = 0
+
+    def as_dict(self):
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses,
+                'hit_rate': round(self.hits / total, 3) if total else 0.0}
+
+
+class NullCache:
+    name = 'none'
+
+    def __init__(self):
+        self.stats = CacheStats()
+
+    def get(self, key):
+        self.stats.misses += 1
+        return False, None
+
+    def set(self, key, value):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def clear(self):
+        pass
+
+    def info(self):
+        return {'backend': self.name, **self.stats.as_dict()}
+
+
+class LRUCache(NullCache):
+    """In-process LRU bounded by the total pickled size of its values."""
+    name = 'memory'
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self.size      = 0
+        self._entries  = OrderedDict()          # key → pickled value
+        self._lock     = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            blob = self._entries.get(key)
+            if blob is None:
+                self.stats.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+        return True, pickle.loads(blob)
+
+    def set(self, key, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._entries[key] = blob
+            self.size += len(blob)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def delete(self, key):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def info(self):
+        return {**super().info(), 'entries': len(self._entries),
+                'bytes': self.size, 'max_bytes': self.max_bytes}
+
+
+class FileCache(NullCache):
+    """
+    One file per entry, written atomically, so several worker processes can
+    share it.  Once the directory grows past `max_bytes` the least recently
+    modified files are removed.
+    """
+    name = 'file'
+    PRUNE_EVERY = 100                            # writes between size checks
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        super().__init__()
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._writes   = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'rb') as fh:
+                value = pickle.load(fh)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            self.stats.misses += 1
+            return False, None
+        self.stats.hits += 1
+        return True, value
+
+    def set(self, key, value):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(key))
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            self.prune()
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _files(self):
+        out = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith('.tmp'):
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                out.append((st.st_mtime, st.st_size, entry.path))
+        return out
+
+    def prune(self):
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        for _, _, path in self._files():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def info(self):
+        files = self._files()
+        return {**super().info(), 'entries': len(files),
+                'bytes': sum(size for _, size, _ in files), 'max_bytes': self.max_bytes}
+
+
+def init_cache(app):
+    backend   = app.config.get('CACHE_BACKEND', 'memory')
+    max_bytes = app.config.get('CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)
+    if backend == 'memory':
+        cache = LRUCache(max_bytes)
+    elif backend == 'file':
+        directory = app.config.get('CACHE_DIR') or os.path.join(app.instance_path, 'cache')
+        cache = FileCache(directory, max_bytes)
+    elif backend == 'none':
+        cache = NullCache()
+    else:
+        raise ValueError(f'Unknown CACHE_BACKEND {backend!r}')
+    app.extensions['result_cache'] = cache
+    return cache
+
+
+def get_cache():
+    return current_app.extensions['result_cache']
+
+
+def _params(params):
+    return '&'.join(f'{k}={params[k]}' for k in sorted(params))
+
+
+def cache_key(endpoint, user_id, params, version):
+    return f'{endpoint}|{user_id}|{_params(params)}|v{version}'
+
+
+def cached_result(endpoint, user_id, params, compute):
+    """
+    Return compute() for (endpoint, user_id, params), reusing the cached
+    value while the user's data version is unchanged.
+    """
+    cache = get_cache()
+    key   = cache_key(endpoint, user_id, params, data_version(user_id))
+    hit, value = cache.get(key)
+    if not hit:
+        value = compute()
+        cache.set(key, value)
+    return value
+
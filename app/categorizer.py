@@ -0,0 +1,192 @@
+"""
+Vendor → category lookup for imported expense rows.
+
+The whole vendor table is compiled once into a single regex: the vendor
+names are folded into a character trie so the alternation shares prefixes
+and a position that can't start any vendor fails on its first character.
+A description is therefore scanned once, whatever the size of the table,
+instead of once per vendor.
+
+Semantics match the original per-vendor loop: vendors only match as whole
+words (`\\b…\\b`, case-insensitive) and when several vendors occur in one
+description the one listed first in the table wins.
+
+Before the vendor table, imports consult the user's learned categories
+(CategoryMemory): every manual recategorization is stored under a normalized
+description key.  Lookups are memoized for the length of one import only,
+so a category learned in any worker is used by the next import.
+"""
+import re
+import threading
+
+from sqlalchemy import select
+
+from . import db
+from .models import CategoryMemory
+
+VENDOR_MAP = {
+    "woolworth":   "Groceries",
+    "coles":       "Groceries",
+    "uber":        "Transport",
+    "transperth":   "Transport",
+    "shell":       "Fuel",
+    "netflix":     "Entertainment",
+    "balthazar":   "Restaurant",
+    "interest":    "Interest",
+    "savings":     "Savings",
+}
+
+
+def _trie_pattern(words):
+    """Regex source matching exactly `words`, longest alternative first."""
+    trie = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[''] = None                      # end-of-word marker
+
+    def build(node):
+        branches = [re.escape(ch) + build(child)
+                    for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        if len(branches) == 1 and '' not in node:
+            return branches[0]
+        body = '(?:' + '|'.join(branches) + ')'
+        return body + '?' if '' in node else body
+
+    return build(trie)
+
+
+class VendorCategorizer:
+    """
+    Compiled vendor table.  Call `rebuild()` whenever the table changes; the
+    compiled state is swapped in one assignment so concurrent readers always
+    see either the old or the new table.
+    """
+
+    def __init__(self, vendor_map=None):
+        self._lock = threading.Lock()
+        self.rebuild(vendor_map or {})
+
+    def rebuild(self, vendor_map):
+        # vendor → (priority, category); priority is the position in the table
+        lookup = {}
+        for i, (vendor, cat) in enumerate(vendor_map.items()):
+            vendor = vendor.lower()
+            if vendor and vendor not in lookup:
+                lookup[vendor] = (i, cat)
+
+        # vendors that end on a word boundary inside a longer vendor
+        # ("shell" in "shell garage") share its start position, so they are
+        # checked together with it
+        inner = {}
+        for vendor in lookup:
+            inner[vendor] = [vendor[:n] for n in range(1, len(vendor))
+                             if vendor[:n] in lookup
+                             and re.match(rf'{re.escape(vendor[:n])}\b', vendor)]
+
+        if lookup:
+            # zero-width scan so overlapping vendors are all reported
+            pattern = re.compile(r'\b(?=(' + _trie_pattern(lookup) + r')\b)')
+        else:
+            pattern = None
+
+        with self._lock:
+            self._state = (pattern, lookup, inner)
+
+    def __len__(self):
+        return len(self._state[1])
+
+    def categorize(self, desc):
+        pattern, lookup, inner = self._state
+        if pattern is None or not desc:
+            return None
+
+        best = None
+        for m in pattern.finditer(desc.lower()):
+            vendor = m.group(1)
+            for v in (vendor, *inner[vendor]):
+                prio, cat = lookup[v]
+                if prio == 0:
+                    return cat
+                if best is None or prio < best[0]:
+                    best = (prio, cat)
+        return best[1] if best else None
+
+
+vendor_categorizer = VendorCategorizer(VENDOR_MAP)
+
+
+def categorize_by_vendor(desc: str):
+    return vendor_categorizer.categorize(desc)
+
+
+#   ---------------- learned per-user categories ----------------
+_NOISE = re.compile(r'[^a-z]+')
+
+
+def normalize_key(desc):
+    """
+    Key under which a description is remembered: lower-case letters only, so
+    card numbers, dates and punctuation that vary between statement lines
+    ("UBER *TRIP 0412", "Uber trip 0519") map to the same key.
+    """
+    return _NOISE.sub(' ', (desc or '').lower()).strip()[:255]
+
+
+def learned_lookup(user_id):
+    """
+    desc → the user's learned category, or None.  Each key is read once per
+    returned function (misses included), so create one per import.
+    """
+    memo = {}
+
+    def lookup(desc):
+        key = normalize_key(desc)
+        if not key:
+            return None
+        if key not in memo:
+            memo[key] = db.session.execute(
+                select(CategoryMemory.category)
+                .where(CategoryMemory.user_id == user_id,
+                       CategoryMemory.description_key == key)).scalar()
+        return memo[key]
+    return lookup
+
+
+def remember_category(user_id, description, category):
+    """Record `category` for `description` (caller commits)."""
+    key = normalize_key(description)
+    if not key or not category:
+        return
+    row = db.session.get(CategoryMemory, (user_id, key))
+    if row is None:
+        db.session.add(CategoryMemory(user_id=user_id, description_key=key, category=category))
+    else:
+        row.category = category
+
+
+def user_categorizer(user_id):
+    """Categorize callback for the importer: learned categories, then vendors."""
+    learned = learned_lookup(user_id)
+
+    def categorize(desc):
+        return learned(desc) or categorize_by_vendor(desc)
+    return categorize
+
+
+def apply_learned(learned, rows):
+    """
+    Override the category of parsed expense rows with the learned category
+    (`learned` from learned_lookup), for rows that were parsed without
+    database access (batch uploads categorize by vendor only in the worker
+    processes).
+    """
+    for row in rows:
+        if row['type'] == 'expense':
+            category = learned(row['description'])
+            if category:
+                row['category'] = category
+    return rows
@@ -0,0 +1,43 @@
+"""
+`flask` CLI commands.
+
+    flask rollup rebuild [--user-id N]
+    flask forecast precompute [--window N ...] [--model NAME] [--full] [--processes N]
+"""
+import click
+from flask.cli import AppGroup
+
+from . import db
+from .forecasting import DEFAULT_MODEL, MODELS
+from .rollup import rebuild
+from .snapshots import STANDARD_WINDOWS, precompute
+
+rollup_cli = AppGroup('rollup', help='Maintain the monthly_rollup table.')
+
+
+@rollup_cli.command('rebuild')
+@click.option('--user-id', type=int, default=None, help='Only rebuild this user.')
+def rollup_rebuild(user_id):
+    """Recompute monthly totals from the transactions table."""
+    buckets = rebuild(user_id)
+    db.session.commit()
+    who = f'user {user_id}' if user_id is not None else 'all users'
+    click.echo(f'Rebuilt {buckets} monthly buckets for {who}.')
+
+
+forecast_cli = AppGroup('forecast', help='Precompute spending forecasts.')
+
+
+@forecast_cli.command('precompute')
+@click.option('--window', 'windows', type=click.IntRange(3, 36), multiple=True,
+              help='History window in months (repeatable). Default: 3, 6, 12 and 24.')
+@click.option('--model', type=click.Choice(['auto', *MODELS]), default=DEFAULT_MODEL,
+              show_default=True, help='Forecast model, as in /api/forecast?model=.')
+@click.option('--full', is_flag=True, help='Recompute every user, not only those whose data changed.')
+@click.option('--processes', type=click.IntRange(0), default=None,
+              help='Worker processes (default FORECAST_PROCESSES; 0 runs in this process).')
+def forecast_precompute(windows, model, full, processes):
+    """Store /api/forecast payloads in forecast_snapshot."""
+    stats = precompute(windows or STANDARD_WINDOWS, model, full, processes)
+    click.echo(f"Computed {stats['snapshots']} snapshots for {stats['users']} users "
+               f"in {stats['seconds']:.1f}s ({stats['users_per_sec']:.1f} users/s).")
@@ -0,0 +1,49 @@
+"""
+Conditional GET for the read APIs.
+
+Every endpoint names a cheap validator, normally the viewed user's data
+version (app/versions.py), which costs one primary-key lookup.  The ETag
+hashes the path, its query string and that validator; a request whose
+If-None-Match carries it gets an empty 304 and the payload is never built.
+
+Responses go out with `Cache-Control: private, no-cache`, so browsers keep
+them but revalidate on every fetch(), which needs no change on the client.
+"""
+import hashlib
+
+from flask import current_app, jsonify, request
+
+from .versions import data_version, data_versions
+
+CACHE_CONTROL = 'private, no-cache'
+
+
+def user_validator(user_id):
+    return ('user', user_id, data_version(user_id))
+
+
+def users_validator(user_ids):
+    """Validator for a resource made of several users' data (e.g. a bill's members)."""
+    return ('users', sorted(data_versions(set(user_ids)).items()))
+
+
+def make_etag(validator):
+    args = sorted(request.args.items(multi=True))
+    raw  = f'{request.path}|{args}|{validator}'
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def conditional_json(validator, build):
+    """
+    jsonify(build()) with an ETag derived from `validator`, or an empty 304
+    when the client already holds the current representation.
+    """
+    etag = make_etag(validator)
+    if etag in request.if_none_match:
+        resp = current_app.response_class(status=304)
+    else:
+        resp = jsonify(build())
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = CACHE_CONTROL
+    return resp
+
@@ -0,0 +1,211 @@
+"""
+Spending forecasts.
+
+`linear_forecast` fits one series: a least-squares line over the last
+`window` months, weighted towards recent months (weights 0.1 … 1.0), and
+extends it `steps` months.  `linear_forecast_batch` does the same for a
+(categories × months) matrix in one closed-form computation, so a user
+with hundreds of categories costs a few array operations instead of one
+np.polyfit per category.  `category_month_matrix` builds that matrix from
+grouped (category, year, month, total) rows.
+
+MODELS registers the alternatives (Holt-Winters smoothing, seasonal naive,
+median of recent means), all with the same batch signature, and `backtest`
+scores them on a user's own history so `best_models` can pick one per
+category.
+"""
+import numpy as np
+
+
+def linear_forecast(history, steps=6, window=12):
+    tail = history[-window:]
+    if len(tail) < 2:
+        return [tail[-1] if tail else 0.0] * steps
+    x = np.arange(len(tail))
+    w = np.linspace(0.1, 1.0, len(tail))
+    m, b = np.polyfit(x, tail, 1, w=w)
+    future_x = np.arange(len(tail), len(tail)+steps)
+    return list((m * future_x + b).round(2))
+
+
+def fit_lines(series, weights):
+    """
+    Slope and intercept of the weighted least-squares line through every
+    row of `series` (rows × n), x = 0 … n-1.
+
+    np.polyfit's `w` multiplies the residuals, so the normal equations use
+    w²; solved in closed form for all rows at once:
+
+        m = (S·Sxy − Sx·Sy) / (S·Sxx − Sx²)      b = (Sy − m·Sx) / S
+    """
+    series = np.asarray(series, dtype=float)
+    x  = np.arange(series.shape[1], dtype=float)
+    ww = np.asarray(weights, dtype=float) ** 2
+
+    s, sx, sxx = ww.sum(), ww @ x, ww @ (x * x)
+    sy  = series @ ww
+    sxy = series @ (ww * x)
+    m = (s * sxy - sx * sy) / (s * sxx - sx * sx)
+    b = (sy - m * sx) / s
+    return m, b
+
+
+def linear_forecast_batch(histories, steps=6, window=12):
+    """
+    linear_forecast for every row of `histories` (categories × months).
+    Returns a (categories × steps) array, rounded to cents.
+    """
+    tail = np.asarray(histories, dtype=float)[:, -window:]
+    rows, n = tail.shape
+    if n < 2:
+        last = tail[:, -1:] if n else np.zeros((rows, 1))
+        return np.repeat(last, steps, axis=1)
+
+    m, b = fit_lines(tail, np.linspace(0.1, 1.0, n))
+    future_x = np.arange(n, n + steps)
+    return (m[:, None] * future_x + b[:, None]).round(2)
+
+
+def category_month_matrix(rows, grid):
+    """
+    Scatter (category, year, month, total) rows into a dense
+    (categories × len(grid)) float array whose columns are the first-of-month
+    dates in `grid` (consecutive months).  Rows outside the grid are ignored.
+    Returns (categories, matrix), categories in order of first appearance.
+    """
+    index = {}                                      # category → row, in order of appearance
+    cat_idx, col_idx, values = [], [], []
+    first = grid[0].year * 12 + grid[0].month - 1
+    for category, year, month, total in rows:
+        cat_idx.append(index.setdefault(category, len(index)))
+        col_idx.append(year * 12 + month - 1 - first)
+        values.append(total)
+
+    cat_idx = np.array(cat_idx, dtype=np.int64)
+    col_idx = np.array(col_idx, dtype=np.int64)
+    inside  = (col_idx >= 0) & (col_idx < len(grid))
+
+    matrix = np.zeros((len(index), len(grid)))
+    np.add.at(matrix, (cat_idx[inside], col_idx[inside]), np.array(values, dtype=float)[inside])
+    return list(index), matrix
+
+
+#   ---------------- other models ----------------
+# Every model maps a (categories × months) history to (categories × steps)
+# forecasts in one pass over the matrix.  `window` is how many trailing
+# months the linear fit uses; the others read the whole history they get.
+SEASON = 12
+
+
+def holt_winters_batch(histories, steps=6, window=12, alpha=0.3, beta=0.1, gamma=0.3):
+    """
+    Additive Holt-Winters exponential smoothing with a 12-month season once
+    there are two full seasons of history, Holt's linear trend before that.
+    Negative forecasts are clipped to zero.
+    """
+    y = np.asarray(histories, dtype=float)
+    rows, n = y.shape
+    horizon = np.arange(1, steps + 1)
+    if n == 0:
+        return np.zeros((rows, steps))
+
+    if n < 2 * SEASON:
+        level = y[:, 0].copy()
+        trend = y[:, 1] - y[:, 0] if n > 1 else np.zeros(rows)
+        for t in range(1, n):
+            prev  = level
+            level = alpha * y[:, t] + (1 - alpha) * (level + trend)
+            trend = beta * (level - prev) + (1 - beta) * trend
+        fc = level[:, None] + trend[:, None] * horizon
+    else:
+        level    = y[:, :SEASON].mean(axis=1)
+        trend    = (y[:, SEASON:2 * SEASON].mean(axis=1) - level) / SEASON
+        seasonal = y[:, :SEASON] - level[:, None]
+        for t in range(SEASON, n):
+            s     = seasonal[:, t % SEASON].copy()
+            prev  = level
+            level = alpha * (y[:, t] - s) + (1 - alpha) * (level + trend)
+            trend = beta * (level - prev) + (1 - beta) * trend
+            seasonal[:, t % SEASON] = gamma * (y[:, t] - level) + (1 - gamma) * s
+        fc = level[:, None] + trend[:, None] * horizon + seasonal[:, (n - 1 + horizon) % SEASON]
+    return np.clip(fc, 0, None).round(2)
+
+
+def seasonal_naive_batch(histories, steps=6, window=12):
+    """The same month a year earlier; the last month when there is under a year of history."""
+    y = np.asarray(histories, dtype=float)
+    rows, n = y.shape
+    if n == 0:
+        return np.zeros((rows, steps))
+    if n < SEASON:
+        return np.repeat(y[:, -1:], steps, axis=1).round(2)
+    idx = n - SEASON + (np.arange(steps) % SEASON)
+    return y[:, idx].round(2)
+
+
+def median_batch(histories, steps=6, window=12, spans=(3, 6, 12)):
+    """Flat forecast: the median of the mean spend over the last 3, 6 and 12 months."""
+    y = np.asarray(histories, dtype=float)
+    rows, n = y.shape
+    if n == 0:
+        return np.zeros((rows, steps))
+    means = np.stack([y[:, -min(span, n):].mean(axis=1) for span in spans], axis=1)
+    return np.repeat(np.median(means, axis=1)[:, None], steps, axis=1).round(2)
+
+
+MODELS = {
+    'linear':         linear_forecast_batch,
+    'holt_winters':   holt_winters_batch,
+    'seasonal_naive': seasonal_naive_batch,
+    'median':         median_batch,
+}
+DEFAULT_MODEL = 'linear'
+
+
+#   ---------------- backtesting ----------------
+def backtest(histories, steps=6, window=12, min_train=6, models=MODELS):
+    """
+    Rolling-origin backtest: for every origin from `min_train` months on,
+    fit each model on the months before it and score its forecast against
+    the next `steps` months (fewer at the end of the history).
+
+    Returns {model name: per-category mean absolute error}; NaN where the
+    history is too short for a single origin.
+    """
+    y = np.asarray(histories, dtype=float)
+    rows, n = y.shape
+    origins = range(min_train, n)
+    errors  = {}
+    for name, model in models.items():
+        total, count = np.zeros(rows), 0
+        for origin in origins:
+            h = min(steps, n - origin)
+            fc = model(y[:, :origin], steps=h, window=window)
+            total += np.abs(fc - y[:, origin:origin + h]).sum(axis=1)
+            count += h
+        errors[name] = total / count if count else np.full(rows, np.nan)
+    return errors
+
+
+def best_models(errors, default=DEFAULT_MODEL):
+    """Per category, the name of the model with the lowest backtest error."""
+    names = list(errors)
+    if not names:
+        return []
+    stacked = np.stack([errors[name] for name in names])           # models × categories
+    if not stacked.size:
+        return []
+    scored = ~np.isnan(stacked).all(axis=0)
+    best   = np.argmin(np.where(np.isnan(stacked), np.inf, stacked), axis=0)
+    return [names[b] if ok else default for b, ok in zip(best, scored)]
+
+
+def forecast_with(histories, choices, steps=6, window=12):
+    """Forecast every category with its own model (`choices`, one name per row)."""
+    y   = np.asarray(histories, dtype=float)
+    out = np.zeros((y.shape[0], steps))
+    choices = np.asarray(choices, dtype=object)
+    for name in set(choices.tolist()):
+        rows = choices == name
+        out[rows] = MODELS[name](y[rows], steps=steps, window=window)
+    return out
@@ -1,6 +1,6 @@
 
 from flask_wtf import FlaskForm
-from flask_wtf.file import FileField, FileAllowed
+from flask_wtf.file import FileField, FileAllowed, MultipleFileField
 from wtforms import DecimalField, SelectField, StringField, DateField, SubmitField, PasswordField,BooleanField
 from wtforms.validators import DataRequired, Optional, NumberRange, Email, EqualTo, ValidationError
 from app.models import User 
@@ -72,6 +72,11 @@ class TransactionForm(FlaskForm):
         validators=[Optional(), FileAllowed(['csv'], 'CSV files only')]
     )
 
+    csv_files = MultipleFileField(
+        'Or upload several CSV files at once',
+        validators=[Optional(), FileAllowed(['csv'], 'CSV files only')]
+    )
+
     submit = SubmitField('Submit')
 
 
@@ -84,7 +89,7 @@ class TransactionForm(FlaskForm):
             return False
 
         # CSV path short-circuits all manual requirements
-        if self.csv_file.data:
+        if self.csv_file.data or any(f for f in self.csv_files.data or []):
             return True
 
         errors = False
@@ -0,0 +1,408 @@
+"""
+Chunked CSV import engine.
+
+Rows are streamed from a `csv.reader` in fixed-size chunks.  Each chunk
+is written with one Core-level executemany INSERT (no ORM objects, no
+identity map) and, by default, committed on its own, so memory stays bounded
+by the chunk size no matter how large the bank export is.
+
+Rows that cannot be parsed are not inserted; they are collected in the
+`ImportReport` instead of being logged one by one.
+
+Two parse modes exist: `parse_chunk_rows` handles one row at a time, while
+`parse_chunk_columnar` turns a chunk into NumPy columns and parses dates,
+amounts and transaction types with vector operations.
+"""
+import re
+from datetime import datetime
+from itertools import islice
+
+import numpy as np
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from . import db
+from .dedupe import DuplicateFilter
+from .models import Transaction
+from .rollup import apply_rows
+from .sniffer import sniff_file
+from .versions import bump
+
+DEFAULT_CHUNK_SIZE  = 1000
+MAX_REPORTED_ERRORS = 100          # keep the report itself bounded too
+
+
+class RowError(ValueError):
+    """A single CSV row that could not be turned into a transaction."""
+
+    def __init__(self, field, value, reason):
+        super().__init__(reason)
+        self.field  = field
+        self.value  = value
+        self.reason = reason
+
+
+class ImportReport:
+    """Counters for one import plus a capped list of rejected rows."""
+
+    def __init__(self):
+        self.parsed   = 0     # data rows read from the file
+        self.inserted = 0     # rows written to `transactions`
+        self.rejected = 0     # rows skipped (bad data or failed chunk)
+        self.duplicates = 0   # rows skipped because they were imported before
+        self.chunks   = 0     # chunks committed
+        self.errors   = []    # [{line, field, value, reason}, …]
+
+    def reject(self, line, field, value, reason):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({
+                'line':   line,
+                'field':  field,
+                'value':  value,
+                'reason': reason,
+            })
+
+    def messages(self, limit=10):
+        """Human readable lines for the first `limit` rejected rows."""
+        return [f"Row {e['line']}: {e['reason']} ({e['value']!r})"
+                for e in self.errors[:limit]]
+
+    def as_dict(self):
+        return {
+            'parsed':   self.parsed,
+            'inserted': self.inserted,
+            'rejected': self.rejected,
+            'duplicates': self.duplicates,
+            'chunks':   self.chunks,
+            'errors':   list(self.errors),
+        }
+
+
+def cell(row, index):
+    """Stripped text of one column; short rows read as empty."""
+    try:
+        return (row[index] or '').strip()
+    except IndexError:
+        return ''
+
+
+def parse_row(row, layout, categorize=None):
+    """
+    Turn one CSV row (a list, indexed by `layout.columns`) into the column
+    values of a Transaction.  Raises RowError when the date or amount can't
+    be parsed.
+    """
+    dt_raw  = cell(row, layout.columns['date'])
+    amt_raw = cell(row, layout.columns['amount']).replace(',', '')
+    desc    = cell(row, layout.columns['description'])
+
+    # parse date with the file's detected format
+    try:
+        dt_obj = datetime.strptime(dt_raw, layout.date_format).date()
+    except ValueError:
+        raise RowError('date', dt_raw, 'bad date')
+
+    # parse amount (keep sign)
+    try:
+        amt = float(amt_raw)
+    except ValueError:
+        raise RowError('amount', amt_raw, 'bad amount')
+
+    # determine tx_type + category + direction
+    if 'transfer' in desc.lower():
+        tx_type   = 'transfer'
+        direction = 'in' if amt >= 0 else 'out'
+        cat       = f"Transfer ({'In' if direction=='in' else 'Out'})"
+    else:
+        direction = None
+        if amt >= 0:
+            tx_type = 'income'
+            cat     = 'income'
+        else:
+            tx_type = 'expense'
+            cat     = (categorize(desc) if categorize else None) or 'uncategorized'
+
+    return {
+        'date':               dt_obj,
+        'amount':             abs(amt),
+        'category':           cat,
+        'description':        desc,
+        'type':               tx_type,
+        'transfer_direction': direction,
+    }
+
+
+def iter_chunks(reader, chunk_size):
+    """Yield lists of (line_num, row) of at most `chunk_size` rows."""
+    numbered = ((reader.line_num, row) for row in reader)
+    while True:
+        chunk = list(islice(numbered, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def parse_chunk_rows(chunk, layout, categorize, report):
+    """Row-at-a-time parse of one chunk.  Returns (rows, lines)."""
+    rows  = []
+    lines = []
+    for line, raw in chunk:
+        report.parsed += 1
+        try:
+            values = parse_row(raw, layout, categorize)
+        except RowError as e:
+            report.reject(line, e.field, e.value, e.reason)
+            continue
+        rows.append(values)
+        lines.append(line)
+    return rows, lines
+
+
+def _ascii_digits(arr):
+    """Mask of non-empty strings made only of 0-9."""
+    return (np.char.str_len(arr) > 0) & (np.char.strip(arr, '0123456789') == '')
+
+
+_NUMERIC_FORMAT = re.compile(r'^%([dmY])([^%\w])%([dmY])\2%([dmY])$')
+
+
+def parse_dates(raw, fmt):
+    """
+    Vectorised equivalent of strptime(x, fmt) over a string array for the
+    all-numeric formats (%d/%m/%Y, %Y-%m-%d, %m/%d/%Y, …).  Other formats
+    fall back to one strptime per element.
+    Returns (datetime64[D] array, valid mask); invalid slots hold 1970-01-01.
+    """
+    spec = _NUMERIC_FORMAT.match(fmt)
+    if not spec or sorted(spec.group(1, 3, 4)) != ['Y', 'd', 'm']:
+        return _parse_dates_loop(raw, fmt)
+    sep = spec.group(2)
+
+    parts         = np.char.partition(np.char.strip(raw), sep)
+    first, sep1   = parts[:, 0], parts[:, 1]
+    parts         = np.char.partition(parts[:, 2], sep)
+    second, sep2, third = parts[:, 0], parts[:, 1], parts[:, 2]
+    fields = dict(zip(spec.group(1, 3, 4), (first, second, third)))
+    day, mon, year = fields['d'], fields['m'], fields['Y']
+
+    ok = ((sep1 == sep) & (sep2 == sep)
+          & _ascii_digits(day)  & (np.char.str_len(day)  <= 2)
+          & _ascii_digits(mon)  & (np.char.str_len(mon)  <= 2)
+          & _ascii_digits(year) & (np.char.str_len(year) == 4))
+
+    d = np.where(ok, day,  '1').astype(np.int64)
+    m = np.where(ok, mon,  '1').astype(np.int64)
+    y = np.where(ok, year, '1970').astype(np.int64)
+    ok &= (d >= 1) & (m >= 1) & (m <= 12) & (y >= 1)
+    d = np.where(ok, d, 1)
+    m = np.where(ok, m, 1)
+    y = np.where(ok, y, 1970)
+
+    month = ((y - 1970) * 12 + (m - 1)).astype('datetime64[M]')
+    dates = month.astype('datetime64[D]') + (d - 1)
+    # day 31 of a 30-day month rolls into the next month: reject it
+    ok &= dates.astype('datetime64[M]') == month
+    return dates, ok
+
+
+def _parse_dates_loop(raw, fmt):
+    dates = np.zeros(len(raw), dtype='datetime64[D]')
+    ok    = np.zeros(len(raw), dtype=bool)
+    for i, v in enumerate(raw.tolist()):
+        try:
+            dates[i] = datetime.strptime(v.strip(), fmt).date()
+            ok[i]    = True
+        except ValueError:
+            pass
+    return dates, ok
+
+
+def parse_amounts(raw):
+    """
+    Vectorised float(x.replace(',', '')) over a string array.
+    Returns (float64 array, valid mask); invalid slots hold 0.0.
+    """
+    cleaned = np.char.replace(np.char.strip(raw), ',', '')
+    try:
+        return cleaned.astype(np.float64), np.ones(len(cleaned), dtype=bool)
+    except ValueError:
+        pass
+
+    # at least one bad value: fall back to a per-element pass for this chunk only
+    amounts = np.zeros(len(cleaned), dtype=np.float64)
+    ok      = np.zeros(len(cleaned), dtype=bool)
+    for i, v in enumerate(cleaned.tolist()):
+        try:
+            amounts[i] = float(v)
+            ok[i]      = True
+        except ValueError:
+            pass
+    return amounts, ok
+
+
+def parse_chunk_columnar(chunk, layout, categorize, report):
+    """
+    Column-at-a-time parse of one chunk: the date, amount and description
+    columns are loaded into arrays and parsed/classified with NumPy.
+    Produces the same rows as `parse_chunk_rows`.  Returns (rows, lines).
+    """
+    report.parsed += len(chunk)
+    if not chunk:
+        return [], []
+
+    cols     = layout.columns
+    lines    = np.array([line for line, _ in chunk])
+    dt_raw   = np.array([cell(row, cols['date']) for _, row in chunk], dtype=str)
+    amt_raw  = np.array([cell(row, cols['amount']) for _, row in chunk], dtype=str)
+    desc     = np.array([cell(row, cols['description']) for _, row in chunk], dtype=str)
+
+    dates, date_ok  = parse_dates(dt_raw, layout.date_format)
+    amounts, amt_ok = parse_amounts(amt_raw)
+
+    keep = date_ok & amt_ok
+    for i in np.flatnonzero(~keep):
+        if not date_ok[i]:
+            report.reject(int(lines[i]), 'date', str(dt_raw[i]), 'bad date')
+        else:
+            report.reject(int(lines[i]), 'amount', str(amt_raw[i]).replace(',', ''), 'bad amount')
+
+    if not keep.any():
+        return [], []
+    lines, dates, amounts, desc = lines[keep], dates[keep], amounts[keep], desc[keep]
+
+    # classify: transfer by description, otherwise income/expense by sign
+    positive    = amounts >= 0
+    is_transfer = np.char.find(np.char.lower(desc), 'transfer') >= 0
+    is_expense  = ~is_transfer & ~positive
+
+    tx_type   = np.where(is_transfer, 'transfer', np.where(positive, 'income', 'expense'))
+    direction = np.where(is_transfer, np.where(positive, 'in', 'out'), None)
+    category  = np.where(is_transfer,
+                         np.where(positive, 'Transfer (In)', 'Transfer (Out)'),
+                         'income').astype(object)
+
+    # categorize each distinct expense description once
+    if is_expense.any():
+        uniq, inverse = np.unique(desc[is_expense], return_inverse=True)
+        cats = np.array([(categorize(str(u)) if categorize else None) or 'uncategorized'
+                         for u in uniq], dtype=object)
+        category[is_expense] = cats[inverse]
+
+    rows = [{
+                'date':               d,
+                'amount':             a,
+                'category':           c,
+                'description':        t,
+                'type':               k,
+                'transfer_direction': r,
+            }
+            for d, a, c, t, k, r in zip(dates.astype(object).tolist(),
+                                        np.abs(amounts).tolist(),
+                                        category.tolist(),
+                                        desc.tolist(),
+                                        tx_type.tolist(),
+                                        direction.tolist())]
+    return rows, lines.tolist()
+
+
+PARSERS = {
+    'rows':     parse_chunk_rows,
+    'columnar': parse_chunk_columnar,
+}
+
+
+def write_chunk(rows):
+    """
+    One executemany INSERT for a list of column dicts, plus the matching
+    monthly_rollup deltas and data-version bump (Core inserts don't fire the
+    ORM session events).
+    """
+    if rows:
+        db.session.execute(insert(Transaction), rows)
+        apply_rows(rows)
+        bump(db.session.connection(), {r['user_id'] for r in rows})
+
+
+def parse_file(path, chunk_size=DEFAULT_CHUNK_SIZE, parse_mode='rows', categorize=None):
+    """
+    Sniff and parse a whole CSV file without touching the database, so it
+    can run in a worker process.  Returns (layout, chunks, report) where
+    `chunks` is a list of (rows, lines) ready for `write_parsed`; nothing is
+    parsed when the layout is missing a required column.
+    """
+    report      = ImportReport()
+    parse_chunk = PARSERS[parse_mode]
+    with open(path, newline='', encoding='utf-8-sig') as fh:
+        layout, reader = sniff_file(fh)
+        if layout.missing:
+            return layout, [], report
+        chunks = [parse_chunk(chunk, layout, categorize, report)
+                  for chunk in iter_chunks(reader, chunk_size)]
+    return layout, chunks, report
+
+
+def write_parsed(chunks, user_id, report, commit_per_chunk=True,
+                 on_chunk=None, skip_duplicates=True):
+    """
+    Write already parsed (rows, lines) chunks for `user_id`, updating
+    `report`.  See import_csv for the keyword arguments.
+    """
+    dupes = DuplicateFilter(user_id) if skip_duplicates else None
+
+    for rows, lines in chunks:
+        if dupes is not None:
+            dupes.assign(rows)
+            rows, lines, skipped = dupes.split(rows, lines)
+            report.duplicates += len(skipped)
+        for values in rows:
+            values['user_id'] = user_id
+
+        try:
+            write_chunk(rows)
+            if commit_per_chunk:
+                db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            if not commit_per_chunk:
+                raise
+            for line in lines:
+                report.reject(line, None, '', f'chunk failed: {e.__class__.__name__}')
+        else:
+            report.inserted += len(rows)
+            report.chunks   += 1
+
+        if on_chunk is not None:
+            on_chunk(report)
+
+    if not commit_per_chunk:
+        db.session.commit()
+
+    return report
+
+
+def import_csv(reader, layout, user_id, categorize=None,
+               chunk_size=DEFAULT_CHUNK_SIZE, commit_per_chunk=True,
+               on_chunk=None, parse_mode='rows', skip_duplicates=True):
+    """
+    Stream `reader` (a csv.reader positioned on the first data row, see
+    sniffer.sniff_file) into the transactions table for `user_id`, reading
+    columns and dates as described by `layout`.
+
+    With `commit_per_chunk` every chunk is committed as soon as it is written
+    and a failing chunk only loses its own rows; otherwise the whole file is
+    committed once at the end.
+
+    `parse_mode` picks a parser from PARSERS ('rows' or 'columnar').
+    With `skip_duplicates` rows whose fingerprint is already stored for the
+    user (an overlapping re-upload) are counted in `report.duplicates` and
+    not inserted.
+    `on_chunk(report)` is called after every chunk, e.g. to publish progress.
+    """
+    report      = ImportReport()
+    parse_chunk = PARSERS[parse_mode]
+    # parsed lazily, so only one chunk is held in memory at a time
+    parsed = (parse_chunk(chunk, layout, categorize, report)
+              for chunk in iter_chunks(reader, chunk_size))
+    return write_parsed(parsed, user_id, report, commit_per_chunk=commit_per_chunk,
+                        on_chunk=on_chunk, skip_duplicates=skip_duplicates)
@@ -0,0 +1,257 @@
+"""
+Background CSV import jobs.
+
+An upload is spooled to disk and recorded as an ImportJob row; a small local
+thread pool then runs the chunked importer against the spooled file and
+publishes its counters on the job row after every chunk.  The browser polls
+`/api/import/<job_id>` instead of holding a request open for the whole import.
+
+A multi-file upload becomes one ImportJob per file sharing a `batch_id`.  The
+files are sniffed, parsed and vendor-categorized in parallel in a process
+pool; the batch thread is the only writer and stores each file's rows as
+soon as its parse finishes, so SQLite never sees concurrent inserts.
+"""
+import json
+import multiprocessing
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from flask import current_app
+
+from . import db
+from .categorizer import apply_learned, categorize_by_vendor, learned_lookup
+from .importer import import_csv, parse_file, write_parsed, DEFAULT_CHUNK_SIZE
+from .models import ImportJob
+from .sniffer import sniff_file
+
+_executor     = None
+_process_pool = None
+
+
+def spool_dir(app=None):
+    app = app or current_app
+    path = app.config.get('IMPORT_SPOOL_DIR') or os.path.join(app.instance_path, 'imports')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def read_layout(path):
+    """Detected CsvLayout of a spooled CSV (see sniffer.sniff_file)."""
+    with open(path, newline='', encoding='utf-8-sig') as fh:
+        return sniff_file(fh)[0]
+
+
+def create_job(user_id, upload, batch_id=None, commit=True):
+    """Spool a werkzeug FileStorage to disk and record a queued ImportJob."""
+    job_id = uuid.uuid4().hex
+    path   = os.path.join(spool_dir(), f'{job_id}.csv')
+    upload.save(path)
+
+    job = ImportJob(id=job_id, user_id=user_id, batch_id=batch_id,
+                    filename=upload.filename or 'upload.csv', path=path)
+    db.session.add(job)
+    if commit:
+        db.session.commit()
+    return job
+
+
+def create_batch(user_id, uploads):
+    """Spool several uploads as one batch; returns (batch_id, jobs)."""
+    batch_id = uuid.uuid4().hex
+    jobs = [create_job(user_id, upload, batch_id=batch_id, commit=False) for upload in uploads]
+    db.session.commit()
+    return batch_id, jobs
+
+
+def discard_spool(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _get_executor(app):
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=app.config.get('IMPORT_WORKERS', 2),
+            thread_name_prefix='import-job')
+    return _executor
+
+
+def _get_process_pool(app):
+    """Parser processes for batch uploads; None when IMPORT_PROCESSES is 0."""
+    global _process_pool
+    workers = app.config.get('IMPORT_PROCESSES', os.cpu_count())
+    if not workers:
+        return None
+    if _process_pool is None:
+        # spawn, not fork: the web process has live threads and DB connections
+        _process_pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    return _process_pool
+
+
+def submit_job(job_id, categorize=None):
+    """Hand a queued job to the worker pool (or run it now when IMPORT_JOBS_INLINE)."""
+    app = current_app._get_current_object()
+    if app.config.get('IMPORT_JOBS_INLINE'):
+        run_job(app, job_id, categorize)
+    else:
+        _get_executor(app).submit(run_job, app, job_id, categorize)
+
+
+def run_job(app, job_id, categorize=None):
+    """Worker entry point: import the spooled file and keep the job row current."""
+    with app.app_context():
+        job = db.session.get(ImportJob, job_id)
+        if job is None:
+            return
+
+        job.status     = 'running'
+        job.started_at = datetime.utcnow()
+        db.session.commit()
+
+        def publish(report):
+            job.rows_parsed   = report.parsed
+            job.rows_inserted = report.inserted
+            job.rows_rejected = report.rejected
+            job.rows_duplicate = report.duplicates
+            db.session.commit()
+
+        try:
+            with open(job.path, newline='', encoding='utf-8-sig') as fh:
+                layout, reader = sniff_file(fh)
+                if layout.missing:
+                    raise ValueError(f"CSV is missing required columns: {', '.join(layout.missing)}")
+
+                report = import_csv(reader, layout, job.user_id,
+                                    categorize=categorize,
+                                    chunk_size=app.config.get('IMPORT_CHUNK_SIZE', DEFAULT_CHUNK_SIZE),
+                                    parse_mode=app.config.get('IMPORT_PARSE_MODE', 'columnar'),
+                                    on_chunk=publish)
+            publish(report)
+            job.errors = json.dumps(report.messages())
+            job.status = 'done'
+        except Exception as e:
+            db.session.rollback()
+            app.logger.exception(f"Import job {job_id} failed")
+            job.errors = json.dumps([str(e)])
+            job.status = 'failed'
+        finally:
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+            discard_spool(job.path)
+
+
+def submit_batch(batch_id):
+    """Hand a batch to the worker pool (or run it now when IMPORT_JOBS_INLINE)."""
+    app = current_app._get_current_object()
+    if app.config.get('IMPORT_JOBS_INLINE'):
+        run_batch(app, batch_id)
+    else:
+        _get_executor(app).submit(run_batch, app, batch_id)
+
+
+def _parse_batch(app, jobs):
+    """Yield (job, future) as each file's parse finishes."""
+    chunk_size = app.config.get('IMPORT_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    parse_mode = app.config.get('IMPORT_PARSE_MODE', 'columnar')
+    args       = (chunk_size, parse_mode, categorize_by_vendor)
+
+    pool = _get_process_pool(app)
+    if pool is None:
+        for job in jobs:
+            yield job, lambda job=job: parse_file(job.path, *args)
+        return
+
+    # largest files first so one big file doesn't finish last on its own
+    by_size = sorted(jobs, key=lambda j: os.path.getsize(j.path), reverse=True)
+    futures = {pool.submit(parse_file, job.path, *args): job for job in by_size}
+    for future in as_completed(futures):
+        yield futures[future], future.result
+
+
+def run_batch(app, batch_id):
+    """
+    Worker entry point for a multi-file upload: parse the files in the
+    process pool and write them here, one file at a time, as they arrive.
+    """
+    with app.app_context():
+        jobs = ImportJob.query.filter_by(batch_id=batch_id).all()
+        now  = datetime.utcnow()
+        for job in jobs:
+            job.status     = 'running'
+            job.started_at = now
+        db.session.commit()
+
+        for job, result in _parse_batch(app, jobs):
+            def publish(report, job=job):
+                job.rows_parsed    = report.parsed
+                job.rows_inserted  = report.inserted
+                job.rows_rejected  = report.rejected
+                job.rows_duplicate = report.duplicates
+                db.session.commit()
+
+            try:
+                layout, chunks, report = result()
+                if layout.missing:
+                    raise ValueError(f"CSV is missing required columns: {', '.join(layout.missing)}")
+
+                # learned categories need the database, so they're applied here
+                learned = learned_lookup(job.user_id)
+                chunks  = ((apply_learned(learned, rows), lines) for rows, lines in chunks)
+                write_parsed(chunks, job.user_id, report, on_chunk=publish)
+                publish(report)
+                job.errors = json.dumps(report.messages())
+                job.status = 'done'
+            except Exception as e:
+                db.session.rollback()
+                app.logger.exception(f"Import job {job.id} in batch {batch_id} failed")
+                job.errors = json.dumps([str(e)])
+                job.status = 'failed'
+            finally:
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
+                discard_spool(job.path)
+
+
+def job_status(job):
+    """JSON-ready progress snapshot for the polling endpoint."""
+    return {
+        'id':           job.id,
+        'filename':     job.filename,
+        'status':       job.status,
+        'finished':     job.finished,
+        'rows_parsed':  job.rows_parsed,
+        'rows_inserted': job.rows_inserted,
+        'rows_rejected': job.rows_rejected,
+        'rows_duplicate': job.rows_duplicate,
+        'elapsed':      round(job.elapsed, 2),
+        'rows_per_sec': job.rows_per_sec,
+        'errors':       json.loads(job.errors) if job.errors else [],
+    }
+
+
+def batch_status(jobs):
+    """Per-file progress plus batch totals and wall time."""
+    files    = [job_status(job) for job in jobs]
+    started  = [job.started_at for job in jobs if job.started_at]
+    finished = all(job.finished for job in jobs)
+    end      = (max(job.finished_at for job in jobs) if finished and jobs
+                else datetime.utcnow())
+    wall     = (end - min(started)).total_seconds() if started else 0.0
+    parsed   = sum(f['rows_parsed'] for f in files)
+    return {
+        'batch_id':      jobs[0].batch_id if jobs else None,
+        'finished':      finished,
+        'files':         files,
+        'rows_parsed':   parsed,
+        'rows_inserted': sum(f['rows_inserted'] for f in files),
+        'rows_rejected': sum(f['rows_rejected'] for f in files),
+        'rows_duplicate': sum(f['rows_duplicate'] for f in files),
+        'wall_time':     round(max(wall, 0.0), 2),
+        'rows_per_sec':  round(parsed / wall, 1) if wall > 0 else 0.0,
+    }
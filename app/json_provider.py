@@ -0,0 +1,108 @@
+"""
+JSON provider for every jsonify() / app.json call.
+
+Views can hand it model values as they come out of a query: Decimal is
+written as a number (float), date and datetime as ISO 8601, enums such as
+TransactionType as their value, numpy scalars and arrays as numbers and
+lists, and SQLAlchemy rows as objects.
+
+When orjson is installed it does the encoding (C, writes bytes directly);
+otherwise the stdlib encoder is used with the same conversions, so the two
+produce the same documents.  That includes NaN and ±inf, which orjson
+writes as null: the stdlib path does the same instead of emitting the
+non-standard `NaN` / `Infinity`.  Keys are sorted, as with Flask's default.
+"""
+import json
+import math
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:                     # optional speed-up
+    orjson = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _default(obj):
+    """Conversions shared by both encoders (orjson handles some natively)."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if np is not None:
+        if isinstance(obj, np.generic):
+            return obj.item()
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+    if hasattr(obj, '_asdict'):                  # sqlalchemy Row, namedtuple
+        return obj._asdict()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def _finite(obj):
+    """`obj` with NaN and ±inf floats replaced by None, as orjson writes them."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _finite(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(v) for v in obj]
+    return obj
+
+
+def _stdlib_default(obj):
+    return _finite(_default(obj))
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    use_orjson = orjson is not None
+
+    def _orjson_options(self, indent=None):
+        opts = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys:
+            opts |= orjson.OPT_SORT_KEYS
+        if indent:
+            opts |= orjson.OPT_INDENT_2
+        return opts
+
+    def dumps(self, obj, **kwargs):
+        if self.use_orjson:
+            return orjson.dumps(obj, default=_default,
+                                option=self._orjson_options(kwargs.get('indent'))).decode('utf-8')
+        kwargs.setdefault('default', _stdlib_default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        kwargs.setdefault('allow_nan', False)
+        try:
+            return json.dumps(obj, **kwargs)
+        except ValueError:
+            if kwargs['allow_nan']:
+                raise
+            # a non-finite float somewhere: only then walk the whole document
+            return json.dumps(_finite(obj), **kwargs)
+
+    def loads(self, s, **kwargs):
+        if self.use_orjson and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if not self.use_orjson:
+            return super().response(*args, **kwargs)
+        obj    = self._prepare_response_obj(args, kwargs)
+        indent = self._app.debug if self.compact is None else not self.compact
+        body   = orjson.dumps(obj, default=_default,
+                              option=self._orjson_options(indent) | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -1,6 +1,7 @@
 from sqlalchemy.sql import func
 from . import db
 from flask_login import UserMixin
+from datetime import datetime
 import enum
 
 friends_table = db.Table(
@@ -72,6 +73,13 @@ class TransactionType(enum.Enum):
 
 class Transaction(db.Model):
     __tablename__ = 'transactions'
+    __table_args__ = (
+        # one row per imported statement line, see app/dedupe.py
+        db.Index('ux_transactions_user_fingerprint', 'user_id', 'fingerprint', unique=True),
+        # per-user date ranges and date ordering (history, dashboards, exports)
+        db.Index('ix_transactions_user_date', 'user_id', 'date'),
+        db.Index('ix_transactions_user_type_date', 'user_id', 'type', 'date'),
+    )
 
     id                 = db.Column(db.Integer, primary_key=True)
     user_id            = db.Column(
@@ -89,6 +97,7 @@ class Transaction(db.Model):
     transfer_direction = db.Column(db.Enum('in','out', name='transfer_dir'), nullable=True)
 
     description        = db.Column(db.String(255), nullable=True)
+    fingerprint        = db.Column(db.String(40), nullable=True)   # CSV imports only
 
     user               = db.relationship(
         'User',
@@ -105,6 +114,10 @@ class Transaction(db.Model):
 
 class BillTransaction(db.Model):
     __tablename__ = 'bill_transaction'
+    __table_args__ = (
+        db.Index('ix_bill_transaction_transaction_id', 'transaction_id'),
+        db.Index('ix_bill_transaction_bill_id', 'bill_id'),
+    )
     id             = db.Column(db.Integer, primary_key=True)
     bill_id        = db.Column(db.Integer, db.ForeignKey('bill.id', ondelete='CASCADE'), nullable=False)
     transaction_id = db.Column(db.Integer, db.ForeignKey('transactions.id', ondelete='CASCADE'), nullable=False)
@@ -144,6 +157,10 @@ class Bill(db.Model):
 
 class BillMember(db.Model):
     __tablename__ = "bill_member"
+    __table_args__ = (
+        db.Index('ix_bill_member_bill_id', 'bill_id'),
+        db.Index('ix_bill_member_user_id', 'user_id'),
+    )
 
     id        = db.Column(db.Integer, primary_key=True)
     bill_id   = db.Column(db.Integer,
@@ -165,6 +182,10 @@ class TransactionFriend(db.Model):
     Confidence stores the similarity score shown to the user for transparency.
     """
     __tablename__ = "transaction_friend"
+    __table_args__ = (
+        db.Index('ix_transaction_friend_transaction_id', 'transaction_id'),
+        db.Index('ix_transaction_friend_friend_id', 'friend_id'),
+    )
 
     id             = db.Column(db.Integer, primary_key=True)
     transaction_id = db.Column(db.Integer,
@@ -173,4 +194,116 @@ class TransactionFriend(db.Model):
     friend_id      = db.Column(db.Integer,
                                db.ForeignKey("users.id", ondelete="CASCADE"),
                                nullable=False)
-    confidence     = db.Column(db.Float, default=1.0)
\ No newline at end of file
+    confidence     = db.Column(db.Float, default=1.0)
+
+class ImportJob(db.Model):
+    """
+    A CSV upload that is processed in the background.
+    The file is spooled to `path`; the counters are updated after every chunk
+    so the browser can poll progress while the import runs.
+    """
+    __tablename__ = "import_job"
+
+    id            = db.Column(db.String(32), primary_key=True)     # uuid4 hex
+    user_id       = db.Column(db.Integer,
+                              db.ForeignKey("users.id", ondelete="CASCADE"),
+                              nullable=False)
+    batch_id      = db.Column(db.String(32), nullable=True, index=True)  # multi-file upload
+    filename      = db.Column(db.String(255), nullable=False)
+    path          = db.Column(db.String(512), nullable=False)
+    status        = db.Column(db.Enum('queued', 'running', 'done', 'failed',
+                                      name='import_status'),
+                              nullable=False, default='queued')
+    rows_parsed   = db.Column(db.Integer, nullable=False, default=0)
+    rows_inserted = db.Column(db.Integer, nullable=False, default=0)
+    rows_rejected = db.Column(db.Integer, nullable=False, default=0)
+    rows_duplicate = db.Column(db.Integer, nullable=False, default=0)
+    errors        = db.Column(db.Text, nullable=True)              # JSON list of messages
+    created_at    = db.Column(db.DateTime, nullable=False, default=func.now())
+    started_at    = db.Column(db.DateTime, nullable=True)
+    finished_at   = db.Column(db.DateTime, nullable=True)
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'failed')
+
+    @property
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        end = self.finished_at or datetime.utcnow()
+        return max((end - self.started_at).total_seconds(), 0.0)
+
+    @property
+    def rows_per_sec(self):
+        return round(self.rows_parsed / self.elapsed, 1) if self.elapsed else 0.0
+
+
+class CategoryMemory(db.Model):
+    """
+    Category a user picked for a description, learned from recategorizations
+    in /history and /api/update_transaction.  Consulted before the vendor map
+    when importing, see app/categorizer.py.
+    """
+    __tablename__ = "category_memory"
+
+    user_id         = db.Column(db.Integer,
+                                db.ForeignKey("users.id", ondelete="CASCADE"),
+                                primary_key=True)
+    description_key = db.Column(db.String(255), primary_key=True)   # normalize_key(description)
+    category        = db.Column(db.String, nullable=False)
+    updated_at      = db.Column(db.DateTime, nullable=False,
+                                default=func.now(), onupdate=func.now())
+
+
+class MonthlyRollup(db.Model):
+    """
+    Per-user totals by (year, month, type, normalized category), kept in step
+    with `transactions` by app/rollup.py.  Dashboards and forecasts read these
+    instead of scanning raw rows.
+    """
+    __tablename__ = "monthly_rollup"
+
+    user_id  = db.Column(db.Integer,
+                         db.ForeignKey("users.id", ondelete="CASCADE"),
+                         primary_key=True)
+    year     = db.Column(db.Integer, primary_key=True)
+    month    = db.Column(db.Integer, primary_key=True)
+    type     = db.Column(db.String(16), primary_key=True)      # TransactionType value
+    category = db.Column(db.String, primary_key=True)          # strip().lower()
+    total    = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    count    = db.Column(db.Integer, nullable=False, default=0)
+
+
+class UserDataVersion(db.Model):
+    """
+    Counter bumped whenever a user's transactions, bill memberships or
+    settings change (app/versions.py).  Cached results are keyed on it, so a
+    write makes every older cache entry unreachable.
+    """
+    __tablename__ = "user_data_version"
+
+    user_id    = db.Column(db.Integer,
+                           db.ForeignKey("users.id", ondelete="CASCADE"),
+                           primary_key=True)
+    version    = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=func.now())
+
+
+class ForecastSnapshot(db.Model):
+    """
+    A precomputed /api/forecast payload (`flask forecast precompute`) for one
+    user, history window and model.  Valid while the user's data version and
+    the month it was computed in are unchanged.
+    """
+    __tablename__ = "forecast_snapshot"
+
+    user_id      = db.Column(db.Integer,
+                             db.ForeignKey("users.id", ondelete="CASCADE"),
+                             primary_key=True)
+    window       = db.Column(db.Integer, primary_key=True)
+    model        = db.Column(db.String(16), primary_key=True)
+    data_version = db.Column(db.Integer, nullable=False)
+    computed_for = db.Column(db.Date, nullable=False)              # the month grid's "today"
+    payload      = db.Column(db.JSON, nullable=False)
+    created_at   = db.Column(db.DateTime, nullable=False, default=func.now())
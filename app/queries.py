@@ -0,0 +1,102 @@
+"""
+Read-path queries for the hot endpoints.
+
+Each helper selects only the columns its caller reads and returns
+SQLAlchemy `Row` tuples (attribute access, no identity map, no change
+tracking) instead of `Transaction` instances.  Pass `yield_per` to get a
+streaming result instead of a list.
+"""
+from datetime import date
+from typing import Iterable, Optional, Sequence
+
+from sqlalchemy import Row, func, select, tuple_
+
+from . import db
+from .models import MonthlyRollup, Transaction, TransactionType, UserSettings
+from .rollup import normalized_category
+
+HISTORY_PER_CATEGORY = 100
+
+# what the transaction APIs send for one row
+HISTORY_COLUMNS = (Transaction.id, Transaction.date, Transaction.amount, Transaction.type,
+                   Transaction.description, Transaction.transfer_direction)
+
+
+def _rows(stmt, yield_per: Optional[int] = None):
+    if yield_per:
+        return db.session.execute(stmt.execution_options(stream_results=True, yield_per=yield_per))
+    return db.session.execute(stmt).all()
+
+
+def category_history(user_id: int, per_category: int = HISTORY_PER_CATEGORY,
+                     yield_per: Optional[int] = None) -> Sequence[Row]:
+    """
+    The latest `per_category` rows of each category, oldest first, plus
+    their normalized category as `cat`.  The database ranks the rows
+    (ROW_NUMBER per normalized category, newest first), so rows past the
+    cap are never loaded.
+    """
+    cat_key = normalized_category(Transaction.category)
+    ranked  = (select(*HISTORY_COLUMNS, cat_key.label('cat'),
+                      func.row_number().over(
+                          partition_by=cat_key,
+                          order_by=(Transaction.date.desc(), Transaction.id.desc())).label('rn'))
+               .where(Transaction.user_id == user_id)
+               .subquery())
+    stmt = (select(*(c for name, c in ranked.c.items() if name != 'rn'))
+            .where(ranked.c.rn <= per_category)
+            .order_by(ranked.c.date, ranked.c.id))
+    return _rows(stmt, yield_per)
+
+
+def full_history(user_id: int, yield_per: Optional[int] = None) -> Sequence[Row]:
+    """Every transaction of the user with its raw category, oldest first."""
+    stmt = (select(*HISTORY_COLUMNS, Transaction.category)
+            .where(Transaction.user_id == user_id)
+            .order_by(Transaction.date, Transaction.id))
+    return _rows(stmt, yield_per)
+
+
+def monthly_expense_totals(user_id: int, first: Optional[date] = None,
+                           last: Optional[date] = None) -> Sequence[Row]:
+    """
+    (category, year, month, total) of the user's expenses per normalized
+    category and month, from the rollup, optionally only for the months
+    `first` … `last` (inclusive).
+    """
+    month = tuple_(MonthlyRollup.year, MonthlyRollup.month)
+    stmt  = (select(MonthlyRollup.category, MonthlyRollup.year, MonthlyRollup.month,
+                    func.sum(MonthlyRollup.total).label('total'))
+             .where(MonthlyRollup.user_id == user_id,
+                    MonthlyRollup.type == TransactionType.expense.value)
+             .group_by(MonthlyRollup.category, MonthlyRollup.year, MonthlyRollup.month)
+             .order_by(MonthlyRollup.year, MonthlyRollup.month))
+    if first is not None:
+        stmt = stmt.where(month >= (first.year, first.month))
+    if last is not None:
+        stmt = stmt.where(month <= (last.year, last.month))
+    return _rows(stmt)
+
+
+def recent_transactions(user_id: int, types: Iterable[TransactionType],
+                        limit: int = 200) -> Sequence[Row]:
+    """The user's latest `limit` transactions of the given types, newest first."""
+    stmt = (select(*HISTORY_COLUMNS, Transaction.category)
+            .where(Transaction.user_id == user_id, Transaction.type.in_(list(types)))
+            .order_by(Transaction.date.desc())
+            .limit(limit))
+    return _rows(stmt)
+
+
+def match_candidates(user_id: int, exclude_id: int, limit: int = 500) -> Sequence[Row]:
+    """(id, date, description, amount) of up to `limit` other transactions of the user."""
+    stmt = (select(Transaction.id, Transaction.date, Transaction.description, Transaction.amount)
+            .where(Transaction.user_id == user_id, Transaction.id != exclude_id)
+            .limit(limit))
+    return _rows(stmt)
+
+
+def monthly_budget(user_id: int):
+    """The user's monthly budget (Decimal), or None when not set."""
+    return db.session.execute(
+        select(UserSettings.monthly_budget).where(UserSettings.user_id == user_id)).scalar()
@@ -0,0 +1,217 @@
+"""
+Incrementally maintained monthly totals (the `monthly_rollup` table).
+
+Every change to a Transaction is turned into deltas on its
+(user_id, year, month, type, category) bucket:
+
+  * ORM inserts, updates and deletes are picked up by session events and
+    written in the same flush, so the rollup commits or rolls back together
+    with the transactions themselves;
+  * Core bulk inserts (the CSV importer, the synthetic seeder) bypass the
+    ORM and call `apply_rows` explicitly.
+
+`rebuild` recomputes the table from `transactions` for backfill or repair
+(`flask rollup rebuild`).
+
+Queries that group by category in SQL use `normalized_category(column)`,
+which runs normalize_category itself on SQLite (registered on every
+connection), so their groups match the rollup's buckets exactly.
+"""
+import sqlite3
+from collections import defaultdict
+from decimal import Decimal
+
+from sqlalchemy import String, delete, event, extract, func, inspect, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.functions import FunctionElement
+
+from . import db
+from .models import MonthlyRollup, Transaction, TransactionType, User
+from .versions import bump
+
+_PENDING = 'rollup_pending'
+
+
+def normalize_category(category):
+    return (category or '').strip().lower()
+
+
+class normalized_category(FunctionElement):
+    """normalize_category(column) in SQL."""
+    type = String()
+    name = 'normalized_category'
+    inherit_cache = True
+
+
+@compiles(normalized_category)
+def _normalized_category(element, compiler, **kw):
+    # other databases: close to, but not exactly, str.strip().lower()
+    return f"lower(trim({compiler.process(element.clauses, **kw)}))"
+
+
+@compiles(normalized_category, 'sqlite')
+def _normalized_category_sqlite(element, compiler, **kw):
+    return f"normalize_category({compiler.process(element.clauses, **kw)})"
+
+
+@event.listens_for(Engine, 'connect')
+def _register_sqlite_functions(dbapi_connection, connection_record):
+    # SQLite's lower() only folds ASCII and trim() only strips spaces
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.create_function('normalize_category', 1, normalize_category,
+                                         deterministic=True)
+
+
+def _type_value(tx_type):
+    if isinstance(tx_type, TransactionType):
+        return tx_type.value
+    return TransactionType[tx_type].value
+
+
+def _bucket(user_id, dt, tx_type, category):
+    return (user_id, dt.year, dt.month, _type_value(tx_type), normalize_category(category))
+
+
+class Deltas:
+    """bucket → [total delta, count delta]"""
+
+    def __init__(self):
+        self.buckets = defaultdict(lambda: [Decimal(0), 0])
+
+    def add(self, user_id, dt, tx_type, category, amount, sign=1):
+        entry = self.buckets[_bucket(user_id, dt, tx_type, category)]
+        entry[0] += sign * Decimal(str(amount))
+        entry[1] += sign
+
+    def __bool__(self):
+        return any(total or count for total, count in self.buckets.values())
+
+
+def _upsert(connection):
+    """INSERT … ON CONFLICT DO UPDATE for the connection's dialect."""
+    if connection.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    stmt = insert(MonthlyRollup)
+    return stmt.on_conflict_do_update(
+        index_elements=['user_id', 'year', 'month', 'type', 'category'],
+        set_={'total': MonthlyRollup.total + stmt.excluded.total,
+              'count': MonthlyRollup.count + stmt.excluded.count})
+
+
+def apply_deltas(connection, deltas):
+    params = [{'user_id': u, 'year': y, 'month': m, 'type': t, 'category': c,
+               'total': total, 'count': count}
+              for (u, y, m, t, c), (total, count) in deltas.buckets.items()
+              if total or count]
+    if not params:
+        return
+    connection.execute(_upsert(connection), params)
+    users = {p['user_id'] for p in params}
+    connection.execute(delete(MonthlyRollup).where(MonthlyRollup.user_id.in_(users),
+                                                   MonthlyRollup.count <= 0))
+
+
+def row_deltas(rows):
+    """Deltas for Transaction column dicts about to be bulk inserted."""
+    deltas = Deltas()
+    for r in rows:
+        deltas.add(r['user_id'], r['date'], r['type'], r['category'], r['amount'])
+    return deltas
+
+
+def apply_rows(rows):
+    """Account for a Core bulk insert of `rows` in the current transaction."""
+    apply_deltas(db.session.connection(), row_deltas(rows))
+
+
+#   ---------------- ORM session events ----------------
+_FIELDS = ('user_id', 'date', 'type', 'category', 'amount')
+
+
+def _current(tx):
+    return tuple(getattr(tx, f) for f in _FIELDS)
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_changes(session, flush_context, instances):
+    """
+    Subtract the stored version of every updated or deleted Transaction.
+    The old values are read from the database rather than from attribute
+    history, which is empty when an expired attribute is overwritten.
+    """
+    changed = [o for o in session.dirty
+               if isinstance(o, Transaction) and session.is_modified(o, include_collections=False)]
+    deleted = [o for o in session.deleted
+               if isinstance(o, Transaction) and inspect(o).persistent]
+    if not changed and not deleted:
+        return
+
+    ids    = [o.id for o in changed + deleted]
+    cols   = [getattr(Transaction, f) for f in _FIELDS]
+    stored = {row[0]: tuple(row[1:]) for row in session.connection().execute(
+                  select(Transaction.id, *cols).where(Transaction.id.in_(ids)))}
+
+    deltas = session.info.setdefault(_PENDING, Deltas())
+    for obj in deleted:
+        if obj.id in stored:
+            deltas.add(*stored[obj.id], sign=-1)
+    for obj in changed:
+        old, new = stored.get(obj.id), _current(obj)
+        if old is not None and old != new:
+            deltas.add(*old, sign=-1)
+            deltas.add(*new)
+
+
+@event.listens_for(Session, 'after_flush')
+def _apply_changes(session, flush_context):
+    # session.new still lists the inserted objects here, with keys assigned
+    deltas = session.info.pop(_PENDING, None) or Deltas()
+    for obj in session.new:
+        if isinstance(obj, Transaction):
+            deltas.add(*_current(obj))
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending(session):
+    session.info.pop(_PENDING, None)
+
+
+#   ---------------- backfill ----------------
+def rebuild(user_id=None):
+    """
+    Recompute the rollup from `transactions` (for one user, or everyone) and
+    return the number of buckets written.  The data version of every user
+    rebuilt is bumped in the same transaction, since results cached from
+    the old rollup no longer hold.  Caller commits.
+    """
+    year, month = extract('year', Transaction.date), extract('month', Transaction.date)
+    q = (select(Transaction.user_id, year, month, Transaction.type, Transaction.category,
+                func.sum(Transaction.amount), func.count())
+         .group_by(Transaction.user_id, year, month, Transaction.type, Transaction.category))
+    clear = delete(MonthlyRollup)
+    if user_id is not None:
+        q     = q.where(Transaction.user_id == user_id)
+        clear = clear.where(MonthlyRollup.user_id == user_id)
+
+    # categories differing only in case/whitespace share a bucket
+    buckets = defaultdict(lambda: [Decimal(0), 0])
+    for uid, y, m, tx_type, category, total, count in db.session.execute(q):
+        entry = buckets[(uid, int(y), int(m), _type_value(tx_type), normalize_category(category))]
+        entry[0] += Decimal(str(total))
+        entry[1] += count
+
+    db.session.execute(clear)
+    users = [user_id] if user_id is not None else db.session.execute(select(User.id)).scalars().all()
+    bump(db.session.connection(), users)
+    if buckets:
+        db.session.execute(MonthlyRollup.__table__.insert(), [
+            {'user_id': u, 'year': y, 'month': m, 'type': t, 'category': c,
+             'total': total, 'count': count}
+            for (u, y, m, t, c), (total, count) in buckets.items()])
+    return len(buckets)
@@ -1,20 +1,29 @@
-import csv
-import re
 import numpy as np
 from collections import defaultdict
 from math import ceil
-from io import TextIOWrapper
-from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app, jsonify, abort, session
+from flask import (Blueprint, render_template, request, redirect, url_for, flash, current_app, jsonify, abort,
+                   session, Response, stream_with_context)
 from flask_login import login_user, logout_user, current_user, login_required
 from werkzeug.security import generate_password_hash, check_password_hash
 from . import db
-from .models import User, UserSettings, Transaction, TransactionType, Bill, BillMember,BillTransaction, TransactionFriend
+from .models import User, UserSettings, Transaction, TransactionType, Bill, BillMember,BillTransaction, TransactionFriend, ImportJob, MonthlyRollup
 from app.forms import TransactionForm, RegistrationForm, LoginForm, LogoutForm
-from datetime import datetime,date, timedelta
+from .cache import cached_result, get_cache
+from .conditional import conditional_json, user_validator, users_validator
+from .forecasting import (MODELS, DEFAULT_MODEL, backtest, best_models, category_month_matrix,
+                          forecast_with)
+from .queries import (HISTORY_PER_CATEGORY, category_history, full_history, monthly_expense_totals,
+                      recent_transactions, match_candidates, monthly_budget)
+from .snapshots import fresh_snapshot
+from .rollup import normalize_category
+from .categorizer import remember_category, user_categorizer
+from .jobs import (create_job, create_batch, read_layout, discard_spool, submit_job,
+                   submit_batch, job_status, batch_status)
+from datetime import date
 from dateutil.relativedelta import relativedelta
 from rapidfuzz import fuzz
 from decimal import Decimal, ROUND_HALF_UP
-from sqlalchemy import func, extract
+from sqlalchemy import func, case
 
 main = Blueprint('main', __name__)
 
@@ -31,7 +40,8 @@ def home():
 @main.route('/dashboard')
 @login_required
 def dashboard():
-    data = gather_dashboard_data(current_user)
+    data = cached_result('dashboard', current_user.id, {'today': date.today().isoformat()},
+                         lambda: gather_dashboard_data(current_user))
     return render_template('dashboard.html', **data)
 
 @main.route('/shared_dashboard/<int:user_id>')
@@ -43,8 +53,9 @@ def shared_dashboard(user_id):
     if other not in current_user.friended_by:
         abort(403)
 
-    # reuse your dashboard logic
-    data = gather_dashboard_data(other)
+    # reuse your dashboard logic (and its cache entry)
+    data = cached_result('dashboard', other.id, {'today': date.today().isoformat()},
+                         lambda: gather_dashboard_data(other))
     # pass in `shared_user` so the template can say “Viewing X’s dashboard”
     return render_template(
     'dashboard.html',
@@ -181,18 +192,18 @@ def api_remove_friend():
 @main.route("/api/friends")
 @login_required
 def api_friends():
-    payload = [
+    return conditional_json(user_validator(current_user.id), lambda: [
         {"id": f.id, "username": f.username}
         for f in sorted(current_user.friends, key=lambda u: u.username.lower())
-    ]
-    return jsonify(payload)
+    ])
 
 @main.route('/api/shared_users')
 @login_required
 def api_shared_users():
-    shared = list(current_user.friended_by)  
-    shared.sort(key=lambda u: u.username)
-    return jsonify([{"id": u.id, "username": u.username} for u in shared])
+    def build():
+        shared = sorted(current_user.friended_by, key=lambda u: u.username)
+        return [{"id": u.id, "username": u.username} for u in shared]
+    return conditional_json(user_validator(current_user.id), build)
 
 
 
@@ -245,80 +256,40 @@ def transactionForm():
 
 
 
+    # --- multi-file CSV import path ---
+    csv_files = [f for f in request.files.getlist('csv_files') if f and f.filename]
+    if csv_files:
+        bad = [f.filename for f in csv_files if not f.filename.lower().endswith('.csv')]
+        if bad:
+            flash(f"Invalid file type ({', '.join(bad)}). Only CSV files are allowed.", "danger")
+            return redirect(request.url)
+
+        # every file is spooled as its own job; the batch parses them in
+        # parallel and reports per-file results
+        batch_id, _ = create_batch(current_user.id, csv_files)
+        submit_batch(batch_id)
+
+        flash(f"{len(csv_files)} CSV files received, importing transactions", "success")
+        return redirect(url_for('main.submission', batch_id=batch_id))
+
     if csv_file and csv_file.filename.lower().endswith('.csv'):
-        stream    = TextIOWrapper(csv_file.stream, encoding='utf-8-sig')
-        reader    = csv.DictReader(stream)
-        headers   = reader.fieldnames or []
-
-        # build a mapping from logical keys to the actual header text
-        required  = ['date', 'amount', 'description']
-        mapping   = {}
-        missing   = []
-        for key in required:
-            for h in headers:
-                if key in h.strip().lower():
-                    mapping[key] = h
-                    break
-            else:
-                missing.append(key)
+        # spool the upload to disk; the import itself runs in the job pool
+        job = create_job(current_user.id, csv_file)
+
+        # detect delimiter, header, column roles and date format
+        missing = read_layout(job.path).missing
 
         if missing:
+            discard_spool(job.path)
+            db.session.delete(job)
+            db.session.commit()
             flash(f"CSV is missing required columns: {', '.join(missing)}", "danger")
             return redirect(request.url)
 
-        added   = 0
-        # now iterate using the real header names
-        for row in reader:
-            dt_raw  = row[mapping['date']].strip()
-            amt_raw = row[mapping['amount']].strip().replace(',', '')
-            desc    = row[mapping['description']].strip()
-
-            # parse date DD/MM/YYYY
-            try:
-                dt_obj = datetime.strptime(dt_raw, "%d/%m/%Y").date()
-            except ValueError:
-                current_app.logger.warning(f"Row {reader.line_num} bad date: {dt_raw}")
-                continue
-
-            # parse amount (keep sign)
-            try:
-                amt = float(amt_raw)
-            except ValueError:
-                current_app.logger.warning(f"Row {reader.line_num} bad amount: {amt_raw}")
-                continue
-
-            # determine tx_type + category + direction
-            if 'transfer' in desc.lower():
-                tx_type  = 'transfer'
-                direction= 'in' if amt >= 0 else 'out'
-                amt      = abs(amt)
-                cat      = f"Transfer ({'In' if direction=='in' else 'Out'})"
-            else:
-                direction = None
-                if amt >= 0:
-                    tx_type = 'income'
-                    cat     = 'income'
-                else:
-                    tx_type = 'expense'
-                    amt     = abs(amt)
-                    cat     = categorize_by_vendor(desc) or 'uncategorized'
-
-            tx = Transaction(
-                user_id            = current_user.id,
-                date               = dt_obj,
-                amount             = amt,
-                category           = cat,
-                description        = desc,
-                type               = tx_type,
-                transfer_direction = direction
-            )
-            db.session.add(tx)
-            added += 1
+        submit_job(job.id, categorize=user_categorizer(current_user.id))
 
-        db.session.commit()
-
-        flash(f"{added} transactions imported from CSV", "success")
-        return redirect(url_for('main.submission', count=added))
+        flash("CSV upload received, importing transactions", "success")
+        return redirect(url_for('main.submission', job_id=job.id))
 
     # --- Manual form path ---
     if form.validate_on_submit():
@@ -391,6 +362,8 @@ def history():
                 flash('Category cannot be empty.', 'warning')
             else:
                 tx.category = new_cat
+                if tx.type != TransactionType.transfer:
+                    remember_category(tx.user_id, tx.description, new_cat)
                 db.session.commit()
                 flash('Category updated.', 'success')
         else:
@@ -415,9 +388,21 @@ def history():
 @main.route('/submission', methods=['GET'])
 @login_required
 def submission():
+    job_id   = request.args.get('job_id')
+    if job_id:
+        # CSV path: the page polls /api/import/<job_id> until the job is done
+        job = ImportJob.query.get_or_404(job_id)
+        if job.user_id != current_user.id:
+            abort(403)
+        return render_template('submission.html', count=job.rows_inserted, job=job_status(job))
+
+    batch_id = request.args.get('batch_id')
+    if batch_id:
+        jobs = batch_jobs_or_404(batch_id)
+        return render_template('submission.html', count=None, batch=batch_status(jobs))
+
     count    = request.args.get('count', type=int)
     if count is not None:
-        # Only CSV path
         return render_template('submission.html', count=count)
 
     # Otherwise, manual path passes amount/category/date/tx_type
@@ -434,49 +419,176 @@ def submission():
         tx_type  = tx_type
     )
 
+@main.route('/api/import/<job_id>')
+@login_required
+def api_import_status(job_id):
+    job = ImportJob.query.get_or_404(job_id)
+    if job.user_id != current_user.id:
+        abort(404)
+    return jsonify(job_status(job))
+
+def batch_jobs_or_404(batch_id):
+    jobs = (ImportJob.query
+            .filter_by(batch_id=batch_id, user_id=current_user.id)
+            .order_by(ImportJob.created_at, ImportJob.filename)
+            .all())
+    if not jobs:
+        abort(404)
+    return jobs
+
+@main.route('/api/import/batch/<batch_id>')
+@login_required
+def api_import_batch_status(batch_id):
+    return jsonify(batch_status(batch_jobs_or_404(batch_id)))
+
+@main.route('/api/cache/stats')
+@login_required
+def api_cache_stats():
+    """Process-wide cache counters, across all users: debug and testing only."""
+    if not (current_app.debug or current_app.testing):
+        abort(404)
+    return jsonify(get_cache().info())
+
 #   grouped transaction by category
 @main.route('/api/transaction')
 @login_required
 def api_transactions():
-    uid = current_user.id
+    uid = viewed_user_id()
+    if request.args.get('format') == 'ndjson':
+        rows = category_history(uid, yield_per=STREAM_BATCH)
+        return ndjson_response(dict(history_item(t), category=t.cat) for t in rows)
+    return conditional_json(user_validator(uid), lambda: cached_result(
+        'api_transaction', uid, {}, lambda: transaction_history(uid)))
+
+@main.route('/api/transaction/export')
+@login_required
+def api_transaction_export():
+    """Every transaction of the viewed user, oldest first, one JSON object per line."""
+    uid  = viewed_user_id()
+    rows = full_history(uid, yield_per=STREAM_BATCH)
+    return ndjson_response((dict(history_item(t), category=t.category) for t in rows),
+                           filename=f'transactions-{uid}.ndjson')
+
+STREAM_BATCH = 1000
+
+def ndjson_response(items, filename=None):
+    """
+    Stream `items` as newline-delimited JSON.  The generator runs while the
+    response is sent, inside the request context, so rows are fetched from
+    the cursor in STREAM_BATCH chunks and never held all at once.
+    """
+    dumps = current_app.json.dumps
+
+    def generate():
+        for item in items:
+            yield dumps(item) + '\n'
 
-    # if the front-end passed ?view_user_id=XYZ, and XYZ != current_user.id,
-    # check that XYZ has friended you, then switch to that ID
+    headers = {'X-Accel-Buffering': 'no'}
+    if filename:
+        headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return Response(stream_with_context(generate()),
+                    mimetype='application/x-ndjson', headers=headers)
+
+def viewed_user_id():
+    """
+    Whose data a read API should return: the current user, or the user in
+    ?view_user_id=XYZ after checking that XYZ has friended you.
+    """
     view_id = request.args.get('view_user_id', type=int)
     if view_id and view_id != current_user.id:
         other = User.query.get_or_404(view_id)
         if other not in current_user.friended_by:
             abort(403)
-        uid = other.id
+        return other.id
+    return current_user.id
 
-    rows = (Transaction.query
-            .filter_by(user_id=uid)
-            .order_by(Transaction.date)
-            .all())
+def history_item(t):
+    return {
+        'id':     t.id,
+        'date':   t.date,
+        'amount': t.amount,
+        'type':   t.type,              # expense | income | transfer
+        'description': t.description,
+        **({'direction': t.transfer_direction} if t.transfer_direction else {})
+    }
 
-    # group by category
+def transaction_history(uid, per_category=HISTORY_PER_CATEGORY):
+    """category_history grouped by category, in order of each one's oldest returned row."""
     grouped = defaultdict(list)
-    for t in rows:
-        key = (t.category or '').strip().lower()
-        grouped[key].append({
-            'id':         t.id,
-            'date':   t.date.isoformat(),
-            'amount': float(t.amount),     # convert Decimal to float for JSON
-            'type':   t.type.value,              # expense | income | transfer
-            'description': t.description,   
-            **({'direction': t.transfer_direction} if t.transfer_direction else {})
-        })
+    for t in category_history(uid, per_category):
+        grouped[t.cat].append(history_item(t))
 
-    data = []
-    for category, items in grouped.items():
-        # only keep the last 100 entries per category
-        items = items[-100:]
-        data.append({
-            'category': category,
-            'history':  items
-        })
+    return [{'category': category, 'history': items}
+            for category, items in grouped.items()]
+
+
+#   dashboard summary: totals, monthly expense series and capped recent lists
+@main.route('/api/transaction/summary')
+@login_required
+def api_transaction_summary():
+    uid    = viewed_user_id()
+    recent = max(1, min(request.args.get('recent', default=SUMMARY_RECENT, type=int), 500))
+    return conditional_json(user_validator(uid), lambda: cached_result(
+        'api_transaction_summary', uid, {'recent': recent},
+        lambda: transaction_summary(uid, recent)))
 
-    return jsonify(data)
+SUMMARY_RECENT = 100
+
+def transaction_summary(uid, recent=SUMMARY_RECENT):
+    """
+    Everything the dashboard draws, aggregated in the database:
+      categories        one entry per (type, category) with the all-time
+                        total, row count and the `recent` latest rows
+      monthly_expenses  expense total per month, oldest first
+    Totals and the monthly series come from the monthly rollup; the recent
+    rows from one windowed query that stops at `recent` per bucket.
+    """
+    buckets = {}
+    monthly = defaultdict(float)
+    for tx_type, cat, yr, mo, total, count in (
+            db.session.query(MonthlyRollup.type, MonthlyRollup.category,
+                             MonthlyRollup.year, MonthlyRollup.month,
+                             MonthlyRollup.total, MonthlyRollup.count)
+            .filter(MonthlyRollup.user_id == uid)):
+        b = buckets.setdefault((tx_type, cat), {
+            'type': tx_type, 'category': cat, 'total': 0.0, 'count': 0, 'history': []})
+        b['total'] += float(total)
+        b['count'] += count
+        if tx_type == TransactionType.expense.value:
+            monthly[f'{yr:04d}-{mo:02d}'] += float(total)
+
+    # partitioned on the raw category: spellings that normalize to the same
+    # bucket are merged (and re-capped) below
+    ranked = (db.session.query(
+                  Transaction.id, Transaction.date, Transaction.amount, Transaction.type,
+                  Transaction.category, Transaction.description, Transaction.transfer_direction,
+                  func.row_number().over(
+                      partition_by=(Transaction.type, Transaction.category),
+                      order_by=(Transaction.date.desc(), Transaction.id.desc())).label('rn'))
+              .filter(Transaction.user_id == uid)
+              .subquery())
+    rows = (db.session.query(ranked)
+            .filter(ranked.c.rn <= recent)
+            .order_by(ranked.c.date, ranked.c.id))
+    for r in rows:
+        b = buckets.get((r.type.value, normalize_category(r.category)))
+        if b is not None:
+            b['history'].append({
+                'id':          r.id,
+                'date':        r.date,
+                'amount':      r.amount,
+                'description': r.description,
+                **({'direction': r.transfer_direction} if r.transfer_direction else {})
+            })
+
+    for b in buckets.values():
+        b['total']   = round(b['total'], 2)
+        b['history'] = b['history'][-recent:]
+    months = sorted(monthly)
+    return {
+        'categories':       sorted(buckets.values(), key=lambda b: (b['type'], b['category'])),
+        'monthly_expenses': {'labels': months, 'totals': [round(monthly[m], 2) for m in months]},
+    }
 
 
 @main.route('/api/update_transaction', methods=['POST'])
@@ -494,6 +606,8 @@ def api_update_transaction():
         return jsonify({'error': 'Transaction not found or unauthorized'}), 404
 
     tx.category = new_category
+    if tx.type != TransactionType.transfer:
+        remember_category(tx.user_id, tx.description, new_category)
     db.session.commit()
     return jsonify({'success': True, 'category': new_category}), 200
 
@@ -517,39 +631,94 @@ def forecast():
 @main.route("/api/forecast")
 @login_required
 def api_forecast():
-    window = request.args.get("months", default=12, type=int)
-    window = max(3, min(window, 36))            # clamp 3-36
-
-    hist_months  = month_starts(-(window-1), window)
+    window = forecast_window(request.args.get("months", default=12, type=int))
+    model  = forecast_model(request.args.get("model"))
+    today  = date.today().isoformat()
+    return conditional_json((user_validator(current_user.id), today),
+                            lambda: forecast_base(current_user.id, window, today, model)['forecast'])
+
+def forecast_window(months):
+    return max(3, min(months or 12, 36))        # clamp 3-36
+
+FORECAST_MODELS = ('auto',) + tuple(MODELS)
+
+def forecast_model(name):
+    """?model=…: one of MODELS, or 'auto' for the best backtested model per category."""
+    if not name:
+        return DEFAULT_MODEL
+    if name not in FORECAST_MODELS:
+        abort(400, f"model must be one of {', '.join(FORECAST_MODELS)}")
+    return name
+
+def cached_forecast(user_id, window, today, model=DEFAULT_MODEL):
+    # the month grid moves with today, so it is part of the key
+    # a snapshot from `flask forecast precompute` saves the fit when still current
+    return cached_result('api_forecast', user_id, {'months': window, 'today': today, 'model': model},
+                         lambda: fresh_snapshot(user_id, window, model)
+                                 or forecast_payload(user_id, window, model))
+
+def forecast_base(user_id, window, today, model=DEFAULT_MODEL):
+    """
+    The forecast and monthly budget that forecast_simulate works from,
+    cached per data version like the forecast itself.
+    """
+    def compute():
+        budget = monthly_budget(user_id)
+        return {'forecast': cached_forecast(user_id, window, today, model),
+                'budget':   float(budget) if budget is not None else None}
+    return cached_result('forecast_base', user_id,
+                         {'months': window, 'today': today, 'model': model}, compute)
+
+MODEL_HISTORY_MONTHS = 36       # what the seasonal models and the backtest look at
+
+def forecast_history(user_id, window, model):
+    """(categories, category × month matrix) the model is fitted on."""
+    months = window if model == 'linear' else max(window, MODEL_HISTORY_MONTHS)
+    grid   = month_starts(-(months-1), months)
+    # category × month expense totals for those months only, grouped in SQL,
+    # scattered onto the month grid
+    rows = monthly_expense_totals(user_id, first=grid[0], last=grid[-1])
+    return category_month_matrix(rows, grid)
+
+def forecast_payload(user_id, window, model=DEFAULT_MODEL):
     future_lbls  = [d.strftime("%b %Y") for d in month_starts(+1, 6)]
+    cats, matrix = forecast_history(user_id, window, model)
 
-    # pull user's expense rows
-    rows = (Transaction.query
-            .filter(Transaction.user_id == current_user.id,
-                    Transaction.type == TransactionType.expense)
-            .order_by(Transaction.date)
-            .all())
+    if model == 'auto':
+        chosen  = forecast_backtest(user_id, window)['best']
+        choices = [chosen.get(c, DEFAULT_MODEL) for c in cats]
+    else:
+        choices = [model] * len(cats)
+    forecasts = forecast_with(matrix, choices, steps=6, window=window)
+
+    cat_forecasts = dict(zip(cats, forecasts.tolist()))
+    overall = forecasts.sum(axis=0).round(2).tolist()
+
+    return dict(months=future_lbls,
+                categories=cat_forecasts,
+                overall=overall,
+                models=dict(zip(cats, choices)))
+
+def forecast_backtest(user_id, window):
+    """Backtest MAE of every model per category, and the best one; cached per data version."""
+    def run():
+        cats, matrix = forecast_history(user_id, window, 'auto')
+        errors = backtest(matrix, steps=6, window=window)
+        best   = best_models(errors)
+        return {'categories': {c: {name: (None if np.isnan(err[i]) else round(float(err[i]), 2))
+                                   for name, err in errors.items()}
+                               for i, c in enumerate(cats)},
+                'best': dict(zip(cats, best))}
+    return cached_result('forecast_backtest', user_id,
+                         {'months': window, 'today': date.today().isoformat()}, run)
+
+@main.route("/api/forecast/backtest")
+@login_required
+def api_forecast_backtest():
+    window = forecast_window(request.args.get("months", default=12, type=int))
+    return conditional_json((user_validator(current_user.id), date.today().isoformat()),
+                            lambda: forecast_backtest(current_user.id, window))
 
-    # aggregate: category → {(yr,mo): total}
-    cat_month_totals = defaultdict(lambda: defaultdict(float))
-    for t in rows:
-        ym = (t.date.year, t.date.month)
-        key = t.category.strip().lower()
-        cat_month_totals[key][ym] += float(t.amount)
-
-    cat_forecasts = {}
-    for cat, month_dict in cat_month_totals.items():        
-        series = [month_dict.get((d.year, d.month), 0.0)    
-                  for d in hist_months]
-        cat_forecasts[cat] = linear_forecast(series,
-                                             steps=6,
-                                             window=window)
-
-    overall = np.sum(list(cat_forecasts.values()), axis=0).round(2).tolist()
-
-    return jsonify(months=future_lbls,
-                   categories=cat_forecasts,
-                   overall=overall)
 @main.route("/api/forecast_simulate", methods=["POST"])
 @login_required
 def api_forecast_simulate():
@@ -562,35 +731,97 @@ def api_forecast_simulate():
         delta = 0.0
 
     cat    = data.get("category")  # None ⇒ overall
-    base   = api_forecast().json
-    series = base["categories"].get(cat, base["overall"]) if cat else base["overall"]
+    base   = forecast_base(current_user.id, simulate_window(data), date.today().isoformat(),
+                            forecast_model(data.get("model")))
+    fc     = base["forecast"]
+    series = fc["categories"].get(cat, fc["overall"]) if cat else fc["overall"]
 
     adjusted = [round(v + delta, 2) for v in series]
-    abs_delta = abs(delta)
+    return jsonify(series=adjusted, advice=simulate_advice(cat, delta, adjusted[-1], base["budget"]))
 
-    if delta == 0:
-        advice = "No change — forecast unchanged."
+SIMULATE_MAX_RESULTS = 5000
+
+@main.route("/api/forecast_simulate/batch", methods=["POST"])
+@login_required
+def api_forecast_simulate_batch():
+    """
+    Every (category, delta) combination in one response, e.g. a whole
+    slider range for the UI to prefetch:
+
+        {"deltas": [-100, -50, 0, 50, 100], "categories": [null, "groceries"], "months": 12}
+
+    `categories` defaults to [null] (overall).  Returns the adjusted series
+    as a [category][delta][month] array, the advice for each combination,
+    and per delta and month whether overall spending would exceed the
+    monthly budget.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        deltas = np.asarray(data.get("deltas") or [], dtype=float)
+    except (TypeError, ValueError):
+        abort(400, "deltas must be a list of numbers")
+    cats = data.get("categories") or [None]
+    if deltas.ndim != 1 or not deltas.size or not np.isfinite(deltas).all():
+        abort(400, "deltas must be a non-empty list of numbers")
+    if not isinstance(cats, list) or not all(c is None or isinstance(c, str) for c in cats):
+        abort(400, "categories must be a list of category names or null")
+    if len(cats) * deltas.size > SIMULATE_MAX_RESULTS:
+        abort(400, f"at most {SIMULATE_MAX_RESULTS} category/delta combinations")
+
+    base    = forecast_base(current_user.id, simulate_window(data), date.today().isoformat(),
+                            forecast_model(data.get("model")))
+    fc      = base["forecast"]
+    overall = np.asarray(fc["overall"], dtype=float)
+    rows    = np.array([fc["categories"].get(c, overall) if c else overall for c in cats],
+                       dtype=float).reshape(len(cats), overall.size)
+
+    # (categories, 1, months) + (1, deltas, 1) → (categories, deltas, months)
+    series = (rows[:, None, :] + deltas[None, :, None]).round(2)
+    budget = base["budget"]
+    if budget:
+        over_budget = (overall[None, :] + deltas[:, None]) > budget
     else:
-        if delta > 0:
-            verb = f"Spending ${abs_delta:.0f} more"
-        else:  # delta < 0
-            verb = f"Spending ${abs_delta:.0f} less"      # or “Cutting”
+        over_budget = np.zeros((deltas.size, overall.size), dtype=bool)
+
+    return jsonify(
+        months=fc["months"],
+        categories=cats,
+        deltas=deltas.tolist(),
+        series=series.tolist(),
+        over_budget=over_budget.tolist(),
+        advice=[[simulate_advice(c, d, final, budget)
+                 for d, final in zip(deltas.tolist(), series[i, :, -1].tolist())]
+                for i, c in enumerate(cats)],
+    )
 
-        prefix = (f"{verb} each month in '{cat}' "
-                if cat else
-                f"{verb} overall each month ")
+def simulate_window(data):
+    try:
+        return forecast_window(int(data.get("months") or request.args.get("months") or 12))
+    except (TypeError, ValueError):
+        return 12
 
-        advice = prefix + f"would push your 6-month projection to ${adjusted[-1]:,.0f}."
+def simulate_advice(cat, delta, final, budget):
+    """The sentence forecast.html shows under a simulated series."""
+    if delta == 0:
+        return "No change — forecast unchanged."
 
-        budget_dec = getattr(current_user.settings, "monthly_budget", None)
-        budget = float(budget_dec) if budget_dec is not None else None
+    abs_delta = abs(delta)
+    if delta > 0:
+        verb = f"Spending ${abs_delta:.0f} more"
+    else:  # delta < 0
+        verb = f"Spending ${abs_delta:.0f} less"      # or “Cutting”
 
-        if delta > 0 and budget and adjusted[-1] > 0.9 * budget:
-            advice += " That’s close to your budget—consider trimming elsewhere."
-        elif delta < 0:
-            advice += " Good move—projection stays comfortably under budget."
+    prefix = (f"{verb} each month in '{cat}' "
+            if cat else
+            f"{verb} overall each month ")
 
-    return jsonify(series=adjusted, advice=advice)
+    advice = prefix + f"would push your 6-month projection to ${final:,.0f}."
+
+    if delta > 0 and budget and final > 0.9 * budget:
+        advice += " That’s close to your budget—consider trimming elsewhere."
+    elif delta < 0:
+        advice += " Good move—projection stays comfortably under budget."
+    return advice
 
 #   ++++++++++++++++++++++ END forecast ++++++++++++++++++++++++++++++
 
@@ -605,16 +836,11 @@ def splitBill():
                        (enough for fuzzy matching)
     • `friends`      – current_user.friends for the dropdown
     """
-    recent_tx = (Transaction.query
-                 .filter(Transaction.user_id == current_user.id,
-                         Transaction.type.in_([
-                         TransactionType.transfer,
-                         TransactionType.expense,
-                         TransactionType.income
-                        ]))
-                 .order_by(Transaction.date.desc())
-                 .limit(200)
-                 .all())
+    recent_tx = recent_transactions(current_user.id, [
+                    TransactionType.transfer,
+                    TransactionType.expense,
+                    TransactionType.income,
+                ], limit=200)
 
     friends = sorted(current_user.friends, key=lambda u: u.username.lower())
 
@@ -678,9 +904,9 @@ def api_bill_suggest_friends(tx_id):
     results = similar_transfers(tx, threshold=85)
     payload = [{
         "id": t.id,
-        "date": t.date.isoformat(),
+        "date": t.date,
         "desc": t.description,
-        "amount": float(t.amount),
+        "amount": t.amount,
         "score": score
     } for t, score in results]
 
@@ -796,16 +1022,17 @@ def api_bill_get(bill_id):
     if current_user.id not in member_ids and bill.created_by != current_user.id:
         abort(403)
 
-    return jsonify({
+    # bills are not edited after creation; their members' rows bump the members' versions
+    return conditional_json(users_validator(member_ids), lambda: {
         "id":          bill.id,
         "description": bill.description,
-        "date":        bill.date.isoformat(),
-        "total":       float(bill.total),
+        "date":        bill.date,
+        "total":       bill.total,
         "members": [{
             "user_id": bm.user_id,
             "username": bm.user.username,
-            "share":  float(bm.share),
-            "paid":   float(bm.paid),
+            "share":  bm.share,
+            "paid":   bm.paid,
             "settled": bm.settled
         } for bm in bill.members]
     })
@@ -856,13 +1083,13 @@ def api_apply_transaction(bill_id):
     db.session.commit()
     return jsonify({
         "user_id":         bm.user_id,
-        "new_outstanding": float(bm.share - bm.paid),
-        "new_paid":      float(bm.paid),
+        "new_outstanding": bm.share - bm.paid,
+        "new_paid":      bm.paid,
         "transaction": {
             "id":            tx_id,
-            "date":          bt.transaction.date.isoformat(),
+            "date":          bt.transaction.date,
             "description":   bt.transaction.description,
-            "amount_applied": float(amt)
+            "amount_applied": amt
         }
     }), 200
 
@@ -872,57 +1099,49 @@ def api_apply_transaction(bill_id):
 
 
 #   ++++++++++++++++++++ helper functions +++++++++++++++++++++
-VENDOR_MAP = {
-    "woolworth":   "Groceries",
-    "coles":       "Groceries",
-    "uber":        "Transport",
-    "transperth":   "Transport",
-    "shell":       "Fuel",
-    "netflix":     "Entertainment",
-    "balthazar":   "Restaurant",
-    "interest":    "Interest",
-    "savings":     "Savings",
-}
-
-
-def categorize_by_vendor(desc: str):
-    text = desc.lower()
-    for vendor, cat in VENDOR_MAP.items():
-
-        if re.search(rf'\b{re.escape(vendor)}\b', text):
-            return cat
-    return None
-
-
-#  get sum of a category in a given year+month
-def sum_category(cat_name, year, month, tx_type='expense', user=None):
-    
-    uid = user.id if user is not None else current_user.id
-    q = db.session.query(
-            func.coalesce(func.sum(Transaction.amount), 0)
-        ).filter(
-            Transaction.user_id == uid,
-            extract('year', Transaction.date) == year,
-            extract('month', Transaction.date) == month,
-        )
-    if cat_name:
-        q = q.filter(Transaction.category == cat_name)
-    if tx_type:
-        q = q.filter(Transaction.type == tx_type)
-    return q.scalar()
+def dashboard_totals(user_id, today=None):
+    """
+    This-month and last-month totals for every (type, category) bucket of a
+    user, in one grouped query.  The date filter is a plain range so the
+    (user_id, date) columns can be searched instead of scanned.
+    Returns {(type, category): (this_month, last_month)}.
+    """
+    today      = today or date.today()
+    this_start = today.replace(day=1)
+    last_start = this_start - relativedelta(months=1)
+    next_start = this_start + relativedelta(months=1)
+
+    in_this = Transaction.date >= this_start
+    rows = (db.session.query(
+                Transaction.type,
+                Transaction.category,
+                func.coalesce(func.sum(case((in_this, Transaction.amount), else_=0)), 0),
+                func.coalesce(func.sum(case((in_this, 0), else_=Transaction.amount)), 0))
+            .filter(Transaction.user_id == user_id,
+                    Transaction.date >= last_start,
+                    Transaction.date <  next_start)
+            .group_by(Transaction.type, Transaction.category)
+            .all())
+
+    return {(tx_type.value, category): (Decimal(str(this)), Decimal(str(last)))
+            for tx_type, category, this, last in rows}
+
 
 def gather_dashboard_data(user):
-    today = date.today()
-    ym_this = (today.year, today.month)
-    last_month = (today.replace(day=1) - timedelta(days=1))
-    ym_last = (last_month.year, last_month.month)
+    totals = dashboard_totals(user.id)
 
-    total_exp_this = sum_category(None, *ym_this, tx_type="expense", user=user)
-    total_exp_last = sum_category(None, *ym_last, tx_type="expense", user=user)
+    def bucket_sum(tx_type, category=None):
+        this = last = Decimal(0)
+        for (t, c), (t_this, t_last) in totals.items():
+            if t == tx_type and category in (None, c):
+                this += t_this
+                last += t_last
+        return this, last
+
+    total_exp_this, total_exp_last = bucket_sum('expense')
     exp_pct_change = ((total_exp_this - total_exp_last) / total_exp_last * 100) if total_exp_last else 0
 
-    savings_this = sum_category('savings', *ym_this, tx_type='income', user=user)
-    savings_last = sum_category('savings', *ym_last, tx_type='income', user=user)
+    savings_this, savings_last = bucket_sum('income', 'savings')
     sav_pct_change = ((savings_this - savings_last) / savings_last * 100) if savings_last else 0
 
     # ensure settings exist
@@ -944,17 +1163,6 @@ def gather_dashboard_data(user):
         'rem_pct':        round(rem_pct, 1),
     }
 
-#    weighted linear regression: newer months weigh more
-def linear_forecast(history, steps=6, window=12):
-    tail = history[-window:]
-    if len(tail) < 2:
-        return [tail[-1] if tail else 0.0] * steps
-    x = np.arange(len(tail))
-    w = np.linspace(0.1, 1.0, len(tail))
-    m, b = np.polyfit(x, tail, 1, w=w)
-    future_x = np.arange(len(tail), len(tail)+steps)
-    return list((m * future_x + b).round(2))
-
 def month_starts(offset: int, count: int):
     """Return `count` first-of-month date objects starting `offset` months from now."""
     start = date.today().replace(day=1) + relativedelta(months=offset)
@@ -965,13 +1173,11 @@ def month_starts(offset: int, count: int):
 
 def similar_transfers(base_tx, threshold: int = 80, limit: int = 20):
     """
-    Return [(Transaction, score), …] that look like `base_tx`
-    (case-insensitive token-set fuzzy match on description).
+    Return [(row, score), …] that look like `base_tx`
+    (case-insensitive token-set fuzzy match on description); rows carry
+    id, date, description and amount.
     """
-    q = (Transaction.query
-                     .filter(Transaction.user_id == base_tx.user_id,
-                             Transaction.id != base_tx.id)
-                     .limit(500))                # early cap for perf
+    q = match_candidates(base_tx.user_id, base_tx.id, limit=500)   # early cap for perf
 
     matches = []
     base_desc = base_tx.description.lower()
@@ -0,0 +1,151 @@
+"""
+Precomputed forecasts (the `forecast_snapshot` table).
+
+`flask forecast precompute` runs the /api/forecast computation
+(routes.forecast_payload) for every user and the standard history windows
+and stores the payloads.  /api/forecast serves a snapshot while the user's
+data version and the current month still match it, so the first load
+after new data does not have to fit anything.
+
+By default only users whose data changed since their snapshot, or whose
+snapshot is from an earlier month, are recomputed.  Users are spread over
+FORECAST_PROCESSES worker processes, each with its own app and database
+connection; the parent process writes every snapshot.
+"""
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+from types import SimpleNamespace
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from . import db
+from .forecasting import DEFAULT_MODEL
+from .models import ForecastSnapshot, User, UserDataVersion
+from .versions import data_version
+
+STANDARD_WINDOWS = (3, 6, 12, 24)       # the choices on the forecast page
+USERS_PER_TASK   = 25
+
+
+def _same_month(a, b):
+    return (a.year, a.month) == (b.year, b.month)
+
+
+def fresh_snapshot(user_id, window, model=DEFAULT_MODEL):
+    """The stored payload if it is still current, else None."""
+    row = db.session.execute(
+        select(ForecastSnapshot.data_version, ForecastSnapshot.computed_for, ForecastSnapshot.payload)
+        .where(ForecastSnapshot.user_id == user_id,
+               ForecastSnapshot.window == window,
+               ForecastSnapshot.model == model)).one_or_none()
+    if row is None or not _same_month(row.computed_for, date.today()):
+        return None
+    if row.data_version != data_version(user_id):
+        return None
+    return row.payload
+
+
+def stale_users(windows, model=DEFAULT_MODEL, full=False):
+    """Ids of the users whose snapshots are missing or out of date."""
+    user_ids = db.session.execute(select(User.id).order_by(User.id)).scalars().all()
+    if full:
+        return user_ids
+
+    versions = dict(db.session.execute(select(UserDataVersion.user_id, UserDataVersion.version)).all())
+    current  = {}                                   # user → windows with a current snapshot
+    today    = date.today()
+    for uid, window, version, computed_for in db.session.execute(
+            select(ForecastSnapshot.user_id, ForecastSnapshot.window,
+                   ForecastSnapshot.data_version, ForecastSnapshot.computed_for)
+            .where(ForecastSnapshot.model == model, ForecastSnapshot.window.in_(list(windows)))):
+        if version == versions.get(uid, 0) and _same_month(computed_for, today):
+            current.setdefault(uid, set()).add(window)
+    return [uid for uid in user_ids if current.get(uid, set()) != set(windows)]
+
+
+def compute_snapshots(user_ids, windows, model=DEFAULT_MODEL):
+    """Snapshot rows for `user_ids`; reads only, in a worker or inline."""
+    from .routes import forecast_payload
+
+    rows, today = [], date.today()
+    for uid in user_ids:
+        # the version goes first: a write during the fit leaves the snapshot stale, not wrong
+        version = data_version(uid)
+        for window in windows:
+            rows.append({'user_id': uid, 'window': window, 'model': model,
+                         'data_version': version, 'computed_for': today,
+                         'payload': forecast_payload(uid, window, model)})
+        db.session.rollback()                       # end the read, let the writer in
+    return rows
+
+
+def _upsert(connection):
+    if connection.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    stmt = insert(ForecastSnapshot)
+    return stmt.on_conflict_do_update(
+        index_elements=['user_id', 'window', 'model'],
+        set_={'data_version': stmt.excluded.data_version,
+              'computed_for': stmt.excluded.computed_for,
+              'payload':      stmt.excluded.payload,
+              'created_at':   func.now()})
+
+
+def store(rows):
+    if rows:
+        db.session.execute(_upsert(db.session.connection()), rows)
+        db.session.commit()
+
+
+#   ---------------- worker processes ----------------
+_worker_app = None
+
+
+def _init_worker(config):
+    global _worker_app
+    from . import create_app
+    _worker_app = create_app(SimpleNamespace(**config))
+
+
+def _compute_in_worker(user_ids, windows, model):
+    with _worker_app.app_context():
+        return compute_snapshots(user_ids, windows, model)
+
+
+def precompute(windows=STANDARD_WINDOWS, model=DEFAULT_MODEL, full=False, processes=None):
+    """
+    Recompute stale (or, with `full`, all) snapshots.  Returns counts and
+    throughput: {'users', 'snapshots', 'seconds', 'users_per_sec'}.
+    """
+    app     = current_app._get_current_object()
+    workers = app.config.get('FORECAST_PROCESSES', 0) if processes is None else processes
+    start   = time.perf_counter()
+
+    user_ids = stale_users(windows, model, full)
+    tasks    = [user_ids[i:i + USERS_PER_TASK] for i in range(0, len(user_ids), USERS_PER_TASK)]
+    written  = 0
+    if workers and len(tasks) > 1:
+        config = {k: v for k, v in app.config.items() if k.isupper()}
+        # spawn, not fork: a forked child would share this process's DB connections
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)),
+                                 mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_worker, initargs=(config,)) as pool:
+            futures = [pool.submit(_compute_in_worker, task, windows, model) for task in tasks]
+            for future in as_completed(futures):
+                rows = future.result()
+                store(rows)
+                written += len(rows)
+    else:
+        for task in tasks:
+            rows = compute_snapshots(task, windows, model)
+            store(rows)
+            written += len(rows)
+
+    seconds = time.perf_counter() - start
+    return {'users': len(user_ids), 'snapshots': written, 'seconds': seconds,
+            'users_per_sec': len(user_ids) / seconds if seconds else 0.0}
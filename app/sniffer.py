@@ -0,0 +1,249 @@
+"""
+CSV layout detection for statement uploads.
+
+Bank exports differ in delimiter, header presence, column order and date
+format.  `sniff_file` samples the first rows of an upload and works out:
+
+  * the delimiter                     (csv.Sniffer over the sample)
+  * whether the first row is a header (no cell of it looks like data)
+  * the column roles date / amount / description / balance
+                                      (header keywords first, then content)
+  * the date format that parses the sampled dates
+
+Layouts of files with a header are cached by header signature, so repeated
+uploads from the same bank skip the column detection.  The cached date
+format is only reused when it parses the new file's sampled dates; the
+same header can come with different date formats.
+"""
+import csv
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+REQUIRED_COLUMNS = ['date', 'amount', 'description']
+ROLES            = REQUIRED_COLUMNS + ['balance']
+
+# header text that identifies a role (substring match, lower-case)
+ROLE_KEYWORDS = {
+    'date':        ('date',),
+    'amount':      ('amount', 'value'),
+    'description': ('description', 'details', 'narrative', 'memo', 'payee'),
+    'balance':     ('balance',),
+}
+
+# candidate formats in order of preference: ambiguous samples such as
+# 03/04/2025 resolve to the first format that parses all of them
+DATE_FORMATS = [
+    '%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y', '%d.%m.%Y', '%Y/%m/%d',
+    '%m/%d/%Y', '%d/%m/%y', '%d %b %Y', '%d-%b-%Y', '%d %B %Y',
+]
+
+SAMPLE_ROWS   = 50
+SAMPLE_BYTES  = 64 * 1024
+CACHE_SIZE    = 256
+MIN_HIT_RATIO = 0.9          # share of sampled cells a role's content test must pass
+
+_NUMBER = re.compile(r'^[-+]?(\d+(\.\d*)?|\.\d+)$')
+
+
+class CsvLayout:
+    """Everything the importer needs to know about one file's shape."""
+
+    def __init__(self, delimiter=',', has_header=True, header=None,
+                 columns=None, date_format=DATE_FORMATS[0]):
+        self.delimiter   = delimiter
+        self.has_header  = has_header
+        self.header      = list(header or [])
+        self.columns     = dict(columns or {})     # role → column index
+        self.date_format = date_format
+
+    @property
+    def missing(self):
+        return [r for r in REQUIRED_COLUMNS if r not in self.columns]
+
+    def __repr__(self):
+        return (f"CsvLayout(delimiter={self.delimiter!r}, has_header={self.has_header}, "
+                f"columns={self.columns}, date_format={self.date_format!r})")
+
+
+_cache      = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cache_get(key):
+    with _cache_lock:
+        layout = _cache.get(key)
+        if layout is not None:
+            _cache.move_to_end(key)
+        return layout
+
+
+def _cache_put(key, layout):
+    with _cache_lock:
+        _cache[key] = layout
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+def is_number(cell):
+    return bool(_NUMBER.match(cell.strip().replace(',', '')))
+
+
+def date_formats_for(cells):
+    """Formats from DATE_FORMATS that parse every non-empty cell."""
+    return [fmt for fmt, hits, total in _format_hits(cells) if hits == total]
+
+
+def best_date_format(cells):
+    """
+    The format that parses the most non-empty cells; ties go to the earlier
+    entry of DATE_FORMATS.  A stray malformed row therefore doesn't stop the
+    rest of the file from being read with the right format.
+    """
+    ranked = [(hits, -i, fmt) for i, (fmt, hits, _) in enumerate(_format_hits(cells)) if hits]
+    return max(ranked)[2] if ranked else None
+
+
+def _format_hits(cells):
+    cells = [c.strip() for c in cells if c.strip()]
+    if not cells:
+        return []
+    out = []
+    for fmt in DATE_FORMATS:
+        hits = 0
+        for c in cells:
+            try:
+                datetime.strptime(c, fmt)
+                hits += 1
+            except ValueError:
+                pass
+        out.append((fmt, hits, len(cells)))
+    return out
+
+
+def _parses_all(cells, fmt):
+    try:
+        for c in cells:
+            if c.strip():
+                datetime.strptime(c.strip(), fmt)
+    except ValueError:
+        return False
+    return True
+
+
+def _looks_like_date(cell):
+    return bool(cell.strip()) and bool(date_formats_for([cell]))
+
+
+def _hit_ratio(cells, test):
+    cells = [c for c in cells if c.strip()]
+    return sum(1 for c in cells if test(c)) / len(cells) if cells else 0.0
+
+
+def header_signature(delimiter, header):
+    return (delimiter, tuple(h.strip().lower() for h in header))
+
+
+def detect_delimiter(sample):
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=',;\t|').delimiter
+    except csv.Error:
+        return ','
+
+
+def detect_layout(sample):
+    """Work out the CsvLayout of a file from its first few KB of text."""
+    delimiter = detect_delimiter(sample)
+    rows = [r for r in csv.reader(sample.splitlines(), delimiter=delimiter) if any(c.strip() for c in r)]
+    rows = rows[:SAMPLE_ROWS + 1]
+    if not rows:
+        return CsvLayout(delimiter=delimiter, has_header=False)
+
+    first = rows[0]
+    has_header = not any(is_number(c) or _looks_like_date(c) for c in first)
+    header = first if has_header else []
+    data   = rows[1:] if has_header else rows
+    ncols  = max(len(r) for r in rows)
+    column = lambda i: [r[i] if i < len(r) else '' for r in data]
+
+    if has_header:
+        cached = _cache_get(header_signature(delimiter, first))
+        if cached is not None:
+            # the header says nothing about the date format: check it against this sample
+            dates = column(cached.columns['date'])
+            if _parses_all(dates, cached.date_format):
+                return cached
+            return CsvLayout(delimiter=delimiter, has_header=True, header=header,
+                             columns=cached.columns,
+                             date_format=best_date_format(dates) or cached.date_format)
+
+    columns = {}
+
+    # 1. header keywords (the original "'date' in header" rule, plus synonyms)
+    for role in ROLES:
+        for i, h in enumerate(header):
+            h = h.strip().lower()
+            if i not in columns.values() and any(k in h for k in ROLE_KEYWORDS[role]):
+                columns[role] = i
+                break
+
+    free = lambda: [i for i in range(ncols) if i not in columns.values()]
+
+    # 2. content: the date column is the one a single format parses throughout
+    if 'date' not in columns:
+        for i in free():
+            cells = column(i)
+            if _hit_ratio(cells, _looks_like_date) >= MIN_HIT_RATIO:
+                columns['date'] = i
+                break
+
+    # numeric columns: the one with both signs is the amount, the next the balance
+    numeric = [i for i in free() if _hit_ratio(column(i), is_number) >= MIN_HIT_RATIO]
+    if 'amount' not in columns and numeric:
+        signed = [i for i in numeric
+                  if any(c.strip().startswith('-') for c in column(i))]
+        columns['amount'] = (signed or numeric)[0]
+        numeric.remove(columns['amount'])
+    if 'balance' not in columns and numeric:
+        columns['balance'] = numeric[0]
+
+    # description: the remaining column with the most text in it
+    if 'description' not in columns:
+        texty = [i for i in free()
+                 if _hit_ratio(column(i), lambda c: not is_number(c) and not _looks_like_date(c)) >= 0.5]
+        if texty:
+            columns['description'] = max(texty, key=lambda i: sum(len(c) for c in column(i)))
+
+    date_format = DATE_FORMATS[0]
+    if 'date' in columns:
+        date_format = best_date_format(column(columns['date'])) or date_format
+
+    layout = CsvLayout(delimiter=delimiter, has_header=has_header, header=header,
+                       columns=columns, date_format=date_format)
+    if has_header and not layout.missing:
+        _cache_put(header_signature(delimiter, first), layout)
+    return layout
+
+
+def sniff_file(fh):
+    """
+    Detect the layout of an open text file and return (layout, reader) with
+    the csv.reader positioned on the first data row.
+    """
+    sample = fh.read(SAMPLE_BYTES)
+    if len(sample) == SAMPLE_BYTES and '\n' in sample:
+        sample = sample[:sample.rindex('\n')]       # drop the partial last line
+    fh.seek(0)
+
+    layout = detect_layout(sample)
+    reader = csv.reader(fh, delimiter=layout.delimiter)
+    if layout.has_header:
+        next(reader, None)
+    return layout, reader
@@ -0,0 +1,97 @@
+"""
+Per-user data versions.
+
+`user_data_version.version` goes up by one in the same transaction as any
+write to a user's Transactions, BillMembers, UserSettings or friend links.  Result caches
+(app/cache.py) put the version in their keys, so nothing has to be deleted
+on a write: the old entries simply stop being asked for.  The same number
+is the ETag validator of the read APIs (app/conditional.py).
+"""
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from . import db
+from .models import Bill, BillMember, Transaction, User, UserDataVersion, UserSettings
+
+_PENDING = 'data_version_pending'
+_GONE    = 'data_version_deleted_users'
+
+# models whose rows belong to the user in their `user_id` column
+VERSIONED_MODELS = (Transaction, BillMember, UserSettings)
+
+# friendship links change the lists of both users on either end
+FRIEND_ATTRS = ('friends', 'friended_by')
+
+
+def data_version(user_id):
+    """Current version for `user_id` (0 before the first write)."""
+    return db.session.execute(
+        select(UserDataVersion.version).where(UserDataVersion.user_id == user_id)
+    ).scalar() or 0
+
+
+def data_versions(user_ids):
+    """{user_id: version} for several users in one query."""
+    found = dict(db.session.execute(
+        select(UserDataVersion.user_id, UserDataVersion.version)
+        .where(UserDataVersion.user_id.in_(list(user_ids)))).all())
+    return {uid: found.get(uid, 0) for uid in user_ids}
+
+
+def _upsert(connection):
+    if connection.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    stmt = insert(UserDataVersion)
+    return stmt.on_conflict_do_update(
+        index_elements=['user_id'],
+        set_={'version': UserDataVersion.version + 1, 'updated_at': func.now()})
+
+
+def bump(connection, user_ids):
+    """Increment the version of every user in `user_ids`."""
+    user_ids = {uid for uid in user_ids if uid is not None}
+    if user_ids:
+        connection.execute(_upsert(connection),
+                           [{'user_id': uid, 'version': 1} for uid in sorted(user_ids)])
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_deletes(session, flush_context, instances):
+    # deleted rows have to be read before the flush removes them
+    pending = session.info.setdefault(_PENDING, set())
+    pending.update(o.user_id for o in session.deleted if isinstance(o, VERSIONED_MODELS))
+    session.info[_GONE] = {o.id for o in session.deleted if isinstance(o, User)}
+
+    # bill members go with their bill through ON DELETE CASCADE, unseen by the ORM
+    bills = [o.id for o in session.deleted if isinstance(o, Bill) and o.id is not None]
+    if bills:
+        pending.update(session.connection().execute(
+            select(BillMember.user_id).where(BillMember.bill_id.in_(bills))).scalars())
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_changed_users(session, flush_context):
+    users = session.info.pop(_PENDING, set())
+    users.update(o.user_id for o in session.new if isinstance(o, VERSIONED_MODELS))
+    users.update(o.user_id for o in session.dirty
+                 if isinstance(o, VERSIONED_MODELS)
+                 and session.is_modified(o, include_collections=False))
+    for user in session.dirty:
+        if isinstance(user, User):
+            for attr in FRIEND_ATTRS:
+                history = inspect(user).attrs[attr].history
+                linked  = [u.id for u in (history.added or ())] + [u.id for u in (history.deleted or ())]
+                if linked:
+                    users.add(user.id)
+                    users.update(linked)
+    users -= session.info.pop(_GONE, set())
+    if users:
+        bump(session.connection(), users)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending(session):
+    session.info.pop(_PENDING, None)
+    session.info.pop(_GONE, None)
@@ -0,0 +1,86 @@
+"""
+Micro-benchmark: compiled VendorCategorizer vs the original per-vendor loop.
+
+    python -m benchmarks.bench_categorizer [--rows 20000]
+
+For growing vendor tables it checks both return the same categories and
+prints rows/s for each implementation.  The legacy loop is only timed on the
+first --legacy-rows descriptions: past ~500 vendors it overflows the `re`
+pattern cache and recompiles every vendor on every row.
+"""
+import argparse
+import random
+import re
+import string
+import time
+
+from app.categorizer import VENDOR_MAP, VendorCategorizer
+
+
+def legacy_categorize(desc, vendor_map):
+    # the pre-compiled-engine implementation, kept here for comparison
+    text = desc.lower()
+    for vendor, cat in vendor_map.items():
+        if re.search(rf'\b{re.escape(vendor)}\b', text):
+            return cat
+    return None
+
+
+def make_vendor_map(size, rnd):
+    vendors = dict(VENDOR_MAP)
+    while len(vendors) < size:
+        name = ''.join(rnd.choices(string.ascii_lowercase, k=rnd.randint(4, 10)))
+        if rnd.random() < 0.2:
+            name += ' ' + ''.join(rnd.choices(string.ascii_lowercase, k=rnd.randint(3, 6)))
+        vendors.setdefault(name, f'Cat{len(vendors) % 40}')
+    return vendors
+
+
+def make_descriptions(vendor_map, rows, rnd):
+    names = list(vendor_map)
+    out = []
+    for _ in range(rows):
+        words = ['POS', 'VISA', str(rnd.randint(1000, 9999))]
+        if rnd.random() < 0.7:
+            words.insert(rnd.randint(0, 3), rnd.choice(names).upper())
+        out.append(' '.join(words))
+    return out
+
+
+def timed(fn, descs):
+    start = time.perf_counter()
+    result = [fn(d) for d in descs]
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--legacy-rows', type=int, default=500)
+    parser.add_argument('--sizes', default='10,100,1000,5000')
+    parser.add_argument('--seed', type=int, default=3403)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    print(f"{'vendors':>8} {'legacy rows/s':>14} {'compiled rows/s':>16} {'speed-up':>9}")
+    for size in (int(s) for s in args.sizes.split(',')):
+        vendor_map = make_vendor_map(size, rnd)
+        descs      = make_descriptions(vendor_map, args.rows, rnd)
+
+        build_start = time.perf_counter()
+        engine      = VendorCategorizer(vendor_map)
+        build_time  = time.perf_counter() - build_start
+
+        sample = descs[:args.legacy_rows]
+        legacy, t_legacy = timed(lambda d: legacy_categorize(d, vendor_map), sample)
+        fast,   t_fast   = timed(engine.categorize, descs)
+        assert legacy == fast[:len(sample)], 'compiled categorizer disagrees with the legacy loop'
+
+        legacy_rate = len(sample) / t_legacy
+        fast_rate   = len(descs) / t_fast
+        print(f"{size:>8} {legacy_rate:>14,.0f} {fast_rate:>16,.0f} "
+              f"{fast_rate / legacy_rate:>8.1f}x   (compile {build_time * 1000:.1f} ms)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+/api/transaction latency as a user's history grows.
+
+    python -m benchmarks.bench_history --sizes 1000,10000,100000
+
+For every size one synthetic user is seeded into a fresh SQLite file and
+the per-category history payload is built with the original approach
+(load every row as an ORM object, group in Python, slice the last 100) and
+with the windowed query in routes.transaction_history.  Both must return
+the same JSON (category order aside).  The window query keeps the
+Python side constant (at most 100 rows per category leave the database);
+what is left grows with the rows SQLite ranks.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+
+from benchmarks.synthetic import rows_for_size
+
+
+def legacy_history(uid):
+    """The pre-window-function implementation, kept for comparison."""
+    from app.models import Transaction
+
+    rows = (Transaction.query
+            .filter_by(user_id=uid)
+            .order_by(Transaction.date, Transaction.id)
+            .all())
+    grouped = defaultdict(list)
+    for t in rows:
+        key = (t.category or '').strip().lower()
+        grouped[key].append({
+            'id':     t.id,
+            'date':   t.date.isoformat(),
+            'amount': float(t.amount),
+            'type':   t.type.value,
+            'description': t.description,
+            **({'direction': t.transfer_direction} if t.transfer_direction else {})
+        })
+    return [{'category': c, 'history': items[-100:]} for c, items in grouped.items()]
+
+
+def seed(n_rows):
+    from sqlalchemy import insert
+    from app import db
+    from app.categorizer import categorize_by_vendor
+    from app.models import User, Transaction
+
+    user = User(username='bench', email='bench@example.com', password='x')
+    db.session.add(user)
+    db.session.commit()
+
+    batch = []
+    for d, amt, desc in rows_for_size(n_rows, seed=n_rows):
+        if 'TRANSFER' in desc:
+            direction = 'in' if amt >= 0 else 'out'
+            tx_type, cat = 'transfer', f"Transfer ({'In' if direction == 'in' else 'Out'})"
+        elif amt >= 0:
+            direction, tx_type, cat = None, 'income', 'income'
+        else:
+            direction, tx_type = None, 'expense'
+            cat = categorize_by_vendor(desc) or 'uncategorized'
+        batch.append({'user_id': user.id, 'date': d, 'amount': abs(amt), 'category': cat,
+                      'type': tx_type, 'transfer_direction': direction, 'description': desc})
+    db.session.execute(insert(Transaction), batch)
+    db.session.commit()
+    return user.id
+
+
+def timed(fn, repeat):
+    from app import db
+    samples = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def run(sizes, repeat):
+    from app import create_app, db
+    from app.routes import transaction_history
+
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            class BenchConfig:
+                SECRET_KEY = 'bench'
+                SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(tmp, 'bench.db')
+                SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+            app = create_app(BenchConfig)
+            with app.app_context():
+                db.create_all()
+                uid = seed(n)
+                old_t, old = timed(lambda: legacy_history(uid), repeat)
+                new_t, new = timed(lambda: transaction_history(uid), repeat)
+                old, new = (sorted(app.json.loads(app.json.dumps(h)), key=lambda c: c['category'])
+                            for h in (old, new))
+                if old != new:
+                    raise SystemExit(f'payload mismatch at {n} rows')
+                returned = sum(len(c['history']) for c in new)
+                print(f"{n:>9} rows  returned {returned:>6}  "
+                      f"legacy {old_t * 1000:>9.1f} ms  window {new_t * 1000:>8.1f} ms  "
+                      f"x{old_t / new_t:.1f}")
+                db.session.remove()
+                db.engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Transaction history API benchmark.')
+    parser.add_argument('--sizes', default='1000,10000,100000')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    run([int(s) for s in args.sizes.split(',')], args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+CSV import throughput and peak-memory benchmark.
+
+    python -m benchmarks.bench_import --sizes 1000,10000,100000
+    python -m benchmarks.bench_import --compare benchmarks/results/import-<stamp>.json
+
+For every size a synthetic single-user export is imported into a fresh
+SQLite file through the same engine the upload jobs use.  Each run is timed
+on its own, then repeated under tracemalloc for the peak Python allocation.
+Results are written as JSON so a later run can be compared against them.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks.synthetic import csv_text, rows_for_size
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def import_once(text, parse_mode, chunk_size):
+    """Import `text` into a brand-new database; returns (seconds, report)."""
+    from app import create_app, db
+    from app.categorizer import user_categorizer
+    from app.importer import import_csv
+    from app.models import User
+    from app.sniffer import sniff_file
+
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchConfig:
+            SECRET_KEY = 'bench'
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(tmp, 'bench.db')
+            SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+        app = create_app(BenchConfig)
+        with app.app_context():
+            db.create_all()
+            user = User(username='bench', email='bench@example.com', password='x')
+            db.session.add(user)
+            db.session.commit()
+
+            start  = time.perf_counter()
+            layout, reader = sniff_file(io.StringIO(text))
+            report = import_csv(reader, layout, user.id,
+                                categorize=user_categorizer(user.id),
+                                chunk_size=chunk_size, parse_mode=parse_mode)
+            took   = time.perf_counter() - start
+            db.session.remove()
+            db.engine.dispose()
+    return took, report
+
+
+def run(sizes, modes, chunk_size, memory=True):
+    results = []
+    for n in sizes:
+        text = csv_text(rows_for_size(n, seed=n))
+        for mode in modes:
+            took, report = import_once(text, mode, chunk_size)
+            entry = {
+                'rows':         n,
+                'parse_mode':   mode,
+                'chunk_size':   chunk_size,
+                'inserted':     report.inserted,
+                'seconds':      round(took, 4),
+                'rows_per_sec': round(n / took, 1),
+            }
+            if memory:
+                tracemalloc.start()
+                import_once(text, mode, chunk_size)
+                entry['peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+                tracemalloc.stop()
+            results.append(entry)
+            print(f"{n:>9} rows  {mode:<9} {entry['rows_per_sec']:>10,.0f} rows/s"
+                  + (f"  peak {entry['peak_mb']:.1f} MB" if memory else ''))
+    return results
+
+
+def compare(current, baseline_path):
+    with open(baseline_path) as fh:
+        baseline = {(r['rows'], r['parse_mode']): r for r in json.load(fh)['results']}
+    print(f"\nvs {baseline_path}")
+    for r in current:
+        old = baseline.get((r['rows'], r['parse_mode']))
+        if old:
+            print(f"{r['rows']:>9} rows  {r['parse_mode']:<9} "
+                  f"throughput x{r['rows_per_sec'] / old['rows_per_sec']:.2f}"
+                  + (f"  peak x{r['peak_mb'] / old['peak_mb']:.2f}"
+                     if 'peak_mb' in r and old.get('peak_mb') else ''))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='CSV import benchmark.')
+    parser.add_argument('--sizes', default='1000,10000,100000')
+    parser.add_argument('--modes', default='rows,columnar')
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc pass')
+    parser.add_argument('--out', help='results file (default: benchmarks/results/import-<stamp>.json)')
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    args = parser.parse_args()
+
+    sizes   = [int(s) for s in args.sizes.split(',')]
+    modes   = args.modes.split(',')
+    results = run(sizes, modes, args.chunk_size, memory=not args.no_memory)
+
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    out   = args.out or os.path.join(RESULTS_DIR, f'import-{stamp}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w') as fh:
+        json.dump({
+            'benchmark': 'import',
+            'timestamp': stamp,
+            'commit':    _git_commit(),
+            'python':    platform.python_version(),
+            'numpy':     np.__version__,
+            'results':   results,
+        }, fh, indent=2)
+    print(f"\nResults written to {out}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
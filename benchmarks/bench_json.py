@@ -0,0 +1,76 @@
+"""
+JSON serialization of a 100k-row transaction payload.
+
+    python -m benchmarks.bench_json --rows 100000
+
+  legacy    per-field Decimal/date/enum conversion loop, then Flask's
+            default stdlib provider (what the views did before)
+  stdlib    FastJSONProvider on the raw values, stdlib encoder
+  orjson    FastJSONProvider on the raw values, orjson (if installed)
+"""
+import argparse
+import statistics
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.json_provider import FastJSONProvider, orjson
+from app.models import TransactionType
+
+
+def make_rows(n):
+    start, types = date(2020, 1, 1), list(TransactionType)
+    return [{'id': i,
+             'date': start + timedelta(days=i % 1500),
+             'amount': Decimal(f'{(i * 37) % 50000 / 100:.2f}'),
+             'type': types[i % len(types)],
+             'description': f'COLES {i % 900} SYDNEY'}
+            for i in range(n)]
+
+
+def legacy(provider, rows):
+    converted = [{'id': r['id'], 'date': r['date'].isoformat(), 'amount': float(r['amount']),
+                  'type': r['type'].value, 'description': r['description']}
+                 for r in rows]
+    return provider.dumps(converted)
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), len(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JSON provider benchmark.')
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app  = Flask(__name__)
+    rows = make_rows(args.rows)
+    default = DefaultJSONProvider(app)
+    slow    = FastJSONProvider(app)
+    slow.use_orjson = False
+    fast    = FastJSONProvider(app)
+
+    cases = [('legacy', lambda: legacy(default, rows)),
+             ('stdlib', lambda: slow.dumps(rows))]
+    if orjson is not None:
+        cases.append(('orjson', lambda: fast.dumps(rows)))
+
+    base = None
+    for name, fn in cases:
+        t, size = timed(fn, args.repeat)
+        base = base or t
+        print(f'{name:<8} {t * 1000:>8.1f} ms  {size / 2**20:>6.1f} MiB  x{base / t:.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Per-request cost of the hot read paths: full ORM entities vs the column
+projections in app/queries.py.
+
+    python -m benchmarks.bench_read_queries --rows 50000
+
+For each path the query is run the way the view used to run it (loading
+`Transaction` / `MonthlyRollup` instances) and through the helper, and
+the median wall time and the tracemalloc peak of one call are reported.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.bench_history import seed
+
+
+def measure(fn, repeat):
+    from app import db
+    samples = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+
+    db.session.expunge_all()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(samples), peak
+
+
+def cases(uid, base_id):
+    from app.models import Transaction, TransactionType, MonthlyRollup
+    from app import queries
+
+    types = [TransactionType.transfer, TransactionType.expense, TransactionType.income]
+    return [
+        ('splitBill recent 200',
+         lambda: (Transaction.query.filter(Transaction.user_id == uid, Transaction.type.in_(types))
+                  .order_by(Transaction.date.desc()).limit(200).all()),
+         lambda: queries.recent_transactions(uid, types, limit=200)),
+        ('similar_transfers 500',
+         lambda: (Transaction.query.filter(Transaction.user_id == uid, Transaction.id != base_id)
+                  .limit(500).all()),
+         lambda: queries.match_candidates(uid, base_id, limit=500)),
+        ('forecast rollup',
+         lambda: (MonthlyRollup.query.filter_by(user_id=uid, type='expense')
+                  .order_by(MonthlyRollup.year, MonthlyRollup.month).all()),
+         lambda: queries.monthly_expense_totals(uid)),
+        ('api_transactions full',
+         lambda: Transaction.query.filter_by(user_id=uid).order_by(Transaction.date).all(),
+         lambda: queries.full_history(uid)),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ORM entities vs projected rows.')
+    parser.add_argument('--rows', type=int, default=50_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    from app import create_app, db
+    from app.rollup import rebuild
+
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchConfig:
+            SECRET_KEY = 'bench'
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(tmp, 'bench.db')
+            SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+        app = create_app(BenchConfig)
+        with app.app_context():
+            db.create_all()
+            uid = seed(args.rows)
+            rebuild(uid)
+            db.session.commit()
+
+            print(f'{"path":<24} {"entities":>18} {"rows":>18}  {"time":>5} {"memory":>6}')
+            for name, orm, projected in cases(uid, base_id=1):
+                t0, m0 = measure(orm, args.repeat)
+                t1, m1 = measure(projected, args.repeat)
+                print(f'{name:<24} {t0 * 1000:>7.1f} ms {m0 / 1024:>6.0f} KiB '
+                      f'{t1 * 1000:>7.1f} ms {m1 / 1024:>6.0f} KiB  x{t0 / t1:4.1f} x{m0 / m1:5.1f}')
+            db.session.remove()
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+"""
+Synthetic multi-user, multi-year transaction data.
+
+    python -m benchmarks.synthetic csv  --users 5 --years 3 --out sampledata/synthetic
+    python -m benchmarks.synthetic seed --users 10000 --years 2 --db /tmp/bench.db
+
+`csv` writes one bank-export style file per user (Date,Amount,Description,
+Balance in the same shape as app/sample_csv.py).  `seed` creates the schema
+in a SQLite database and writes users, friendships and transactions directly
+with bulk INSERTs, which is much faster than importing the CSVs.
+
+Every user gets a monthly salary, rent, a weekly grocery shop, spending at
+vendors drawn from a Zipf-like popularity curve and occasional transfers to
+and from friends; the knobs below control the mix.
+"""
+import argparse
+import csv
+import os
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.categorizer import VENDOR_MAP
+
+EXTRA_VENDORS = [
+    'kmart', 'bunnings', 'aldi', 'iga', 'jb hi-fi', 'officeworks', 'chemist warehouse',
+    'dan murphys', 'spotify', 'stan', 'guzman y gomez', 'mcdonalds', 'hungry jacks',
+    'telstra', 'optus', 'synergy', 'water corp', 'ampol', 'bp', 'caltex', 'qantas',
+    'virgin australia', 'myer', 'david jones', 'target', 'big w', 'rebel sport',
+]
+FRIEND_NAMES = ['alex', 'sam', 'jordan', 'casey', 'riley', 'morgan', 'taylor', 'jamie']
+
+
+class Profile:
+    """Distribution knobs shared by the csv and seed commands."""
+
+    def __init__(self, years=2, tx_per_month=40, transfer_rate=0.05,
+                 friends=3, vendors=len(VENDOR_MAP) + len(EXTRA_VENDORS),
+                 zipf=1.2, end=None):
+        self.years         = years
+        self.tx_per_month  = tx_per_month
+        self.transfer_rate = transfer_rate
+        self.friends       = friends
+        self.vendors       = ([v.upper() for v in VENDOR_MAP if v not in ('interest', 'savings')]
+                              + [v.upper() for v in EXTRA_VENDORS])[:max(vendors, 1)]
+        self.zipf          = zipf
+        self.end           = end or date.today().replace(day=1) - timedelta(days=1)
+
+    @property
+    def start(self):
+        return self.end.replace(year=self.end.year - self.years) + timedelta(days=1)
+
+    def vendor_weights(self):
+        ranks = np.arange(1, len(self.vendors) + 1, dtype=float)
+        w = 1.0 / ranks ** self.zipf
+        return w / w.sum()
+
+
+def user_rows(rng, profile, friend_names=()):
+    """
+    One user's history as a date-sorted list of (date, signed amount, description).
+    """
+    start, end = profile.start, profile.end
+    days       = (end - start).days + 1
+    rows       = []
+
+    salary = round(float(rng.uniform(3000, 9000)), 2)
+    rent   = round(float(rng.uniform(900, 2600)), 2)
+    month  = start.replace(day=1)
+    while month <= end:
+        payday = month + timedelta(days=14)
+        if start <= payday <= end:
+            rows.append((payday, salary, 'SALARY ACME PTY LTD'))
+        if start <= month <= end:
+            rows.append((month, -rent, 'RENT PAYMENT'))
+        month = (month + timedelta(days=32)).replace(day=1)
+
+    for week in range(0, days, 7):
+        rows.append((start + timedelta(days=min(week + int(rng.integers(0, 7)), days - 1)),
+                     -round(float(rng.gamma(4.0, 35.0)), 2),
+                     f"{'WOOLWORTHS' if rng.random() < 0.6 else 'COLES'} {int(rng.integers(1000, 9999))}"))
+
+    n      = int(profile.tx_per_month * days / 30.4)
+    offset = rng.integers(0, days, size=n)
+    vendor = rng.choice(len(profile.vendors), size=n, p=profile.vendor_weights())
+    spend  = np.round(rng.lognormal(3.2, 0.9, size=n), 2)
+    xfer   = rng.random(n) < profile.transfer_rate
+    xin    = rng.random(n) < 0.4
+    for off, v, amt, is_xfer, is_in in zip(offset.tolist(), vendor.tolist(), spend.tolist(),
+                                            xfer.tolist(), xin.tolist()):
+        d = start + timedelta(days=off)
+        if is_xfer:
+            who = friend_names[off % len(friend_names)] if friend_names else 'savings'
+            if is_in:
+                rows.append((d, amt, f'TRANSFER FROM {who.upper()}'))
+            else:
+                rows.append((d, -amt, f'TRANSFER TO {who.upper()}'))
+        else:
+            rows.append((d, -amt, f'{profile.vendors[v]} {int(rng.integers(100, 999))}'))
+
+    rows.sort(key=lambda r: r[0])
+    return rows
+
+
+def write_csv(path, rows, opening_balance=1000.0):
+    balance = opening_balance
+    with open(path, 'w', newline='') as fh:
+        w = csv.writer(fh)
+        w.writerow(['Date', 'Amount', 'Description', 'Balance'])
+        for d, amt, desc in rows:
+            balance = round(balance + amt, 2)
+            w.writerow([d.strftime('%d/%m/%Y'), f'{amt:.2f}', desc, f'{balance:.2f}'])
+
+
+def csv_text(rows):
+    """Same format as write_csv, as one string (used by the benchmarks)."""
+    lines = ['Date,Amount,Description,Balance']
+    balance = 1000.0
+    for d, amt, desc in rows:
+        balance = round(balance + amt, 2)
+        lines.append(f"{d.strftime('%d/%m/%Y')},{amt:.2f},{desc},{balance:.2f}")
+    return '\n'.join(lines) + '\n'
+
+
+def rows_for_size(n_rows, seed=0, **profile_kw):
+    """At least `n_rows` rows for a single synthetic user, trimmed to size."""
+    rng     = np.random.default_rng(seed)
+    profile = Profile(**profile_kw)
+    rows    = []
+    while len(rows) < n_rows:
+        rows.extend(user_rows(rng, profile, FRIEND_NAMES))
+        profile = Profile(**{**profile_kw, 'end': profile.start - timedelta(days=1)})
+    rows.sort(key=lambda r: r[0])
+    return rows[-n_rows:]
+
+
+def cmd_csv(args, profile):
+    os.makedirs(args.out, exist_ok=True)
+    rng = np.random.default_rng(args.seed)
+    total = 0
+    for u in range(1, args.users + 1):
+        rows = user_rows(rng, profile, FRIEND_NAMES[:profile.friends])
+        path = os.path.join(args.out, f'user_{u:05d}.csv')
+        write_csv(path, rows)
+        total += len(rows)
+    print(f"Written {args.users} files, {total} rows to {args.out}")
+
+
+def cmd_seed(args, profile):
+    from sqlalchemy import insert
+    from werkzeug.security import generate_password_hash
+    from app import create_app, db
+    from app.categorizer import categorize_by_vendor
+    from app.models import User, UserSettings, Transaction, friends_table
+    from app.rollup import apply_rows
+
+    class SeedConfig:
+        SECRET_KEY = 'synthetic'
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.abspath(args.db)
+        SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    app = create_app(SeedConfig)
+    rng = np.random.default_rng(args.seed)
+    started = time.perf_counter()
+    with app.app_context():
+        db.create_all()
+        first = (db.session.query(db.func.max(User.id)).scalar() or 0) + 1
+        ids   = list(range(first, first + args.users))
+        pw    = generate_password_hash('password')   # hashed once, shared by all
+
+        db.session.execute(insert(User), [
+            {'id': i, 'username': f'synth{i}', 'email': f'synth{i}@example.com', 'password': pw}
+            for i in ids])
+        db.session.execute(insert(UserSettings), [
+            {'user_id': i, 'monthly_budget': round(float(rng.uniform(1500, 6000)), 2),
+             'currency': 'AUD', 'timezone': 'Australia/Perth'} for i in ids])
+
+        links   = set()
+        friends = {i: [] for i in ids}
+        for i in ids:
+            for f in rng.choice(ids, size=min(profile.friends, len(ids) - 1), replace=False).tolist():
+                if f != i and (i, f) not in links:
+                    links.add((i, f))
+                    friends[i].append(f'synth{f}')
+        if links:
+            db.session.execute(insert(friends_table),
+                               [{'user_id': a, 'friend_id': b} for a, b in links])
+        db.session.commit()
+
+        total = 0
+        for i in ids:
+            batch = []
+            for d, amt, desc in user_rows(rng, profile, friends[i]):
+                if 'TRANSFER' in desc:
+                    direction = 'in' if amt >= 0 else 'out'
+                    tx_type, cat = 'transfer', f"Transfer ({'In' if direction == 'in' else 'Out'})"
+                elif amt >= 0:
+                    direction, tx_type, cat = None, 'income', 'income'
+                else:
+                    direction, tx_type = None, 'expense'
+                    cat = categorize_by_vendor(desc) or 'uncategorized'
+                batch.append({'user_id': i, 'date': d, 'amount': abs(amt), 'category': cat,
+                              'type': tx_type, 'transfer_direction': direction,
+                              'description': desc})
+            db.session.execute(insert(Transaction), batch)
+            apply_rows(batch)
+            db.session.commit()
+            total += len(batch)
+
+    took = time.perf_counter() - started
+    print(f"Seeded {args.users} users, {len(links)} friendships, {total} transactions "
+          f"into {args.db} in {took:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic transaction data.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    for name in ('csv', 'seed'):
+        p = sub.add_parser(name)
+        p.add_argument('--users', type=int, default=5)
+        p.add_argument('--years', type=int, default=2)
+        p.add_argument('--tx-per-month', type=int, default=40)
+        p.add_argument('--transfer-rate', type=float, default=0.05)
+        p.add_argument('--friends', type=int, default=3)
+        p.add_argument('--vendors', type=int, default=len(VENDOR_MAP) + len(EXTRA_VENDORS))
+        p.add_argument('--zipf', type=float, default=1.2, help='vendor popularity skew')
+        p.add_argument('--seed', type=int, default=3403)
+    sub.choices['csv'].add_argument('--out', default='sampledata/synthetic')
+    sub.choices['seed'].add_argument('--db', default='synthetic.db')
+    args = parser.parse_args()
+
+    profile = Profile(years=args.years, tx_per_month=args.tx_per_month,
+                      transfer_rate=args.transfer_rate, friends=args.friends,
+                      vendors=args.vendors, zipf=args.zipf)
+    {'csv': cmd_csv, 'seed': cmd_seed}[args.command](args, profile)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,24 @@
 import os
+import tempfile
 class Config:
     SECRET_KEY =  os.environ.get('SECRET_KEY')
     SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(os.path.abspath(os.path.dirname(__file__)), 'database.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    IMPORT_CHUNK_SIZE = 1000   # rows per bulk INSERT / commit during CSV import
+    IMPORT_WORKERS    = 2      # background threads processing uploaded CSVs
+    IMPORT_PARSE_MODE = 'columnar'   # 'columnar' (NumPy) or 'rows' (per-row parse)
+    IMPORT_PROCESSES  = min(4, os.cpu_count() or 1)   # parser processes for multi-file uploads
+    CACHE_BACKEND     = os.environ.get('CACHE_BACKEND', 'memory')   # 'memory', 'file' or 'none'
+    CACHE_MAX_BYTES   = 64 * 2**20
+    CACHE_DIR         = os.environ.get('CACHE_DIR')   # file backend; default instance/cache
+    FORECAST_PROCESSES = min(4, os.cpu_count() or 1)  # worker processes for `flask forecast precompute`
 
 class TestConfig:
     TESTING = True
     SECRET_KEY = os.environ.get('TEST_SECRET_KEY')
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    IMPORT_JOBS_INLINE = True   # run import jobs in the request so tests see the result
+    IMPORT_PROCESSES   = 0      # parse batch uploads in-process
+    FORECAST_PROCESSES = 0      # precompute forecasts in-process
+    IMPORT_SPOOL_DIR   = os.path.join(tempfile.gettempdir(), 'fda-test-imports')
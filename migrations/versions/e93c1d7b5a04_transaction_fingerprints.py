@@ -0,0 +1,67 @@
+"""transactions: content fingerprint for duplicate detection
+
+Revision ID: e93c1d7b5a04
+Revises: 4b1e6f0a9c27
+Create Date: 2026-10-18 11:02:17.530912
+
+"""
+import hashlib
+import re
+from collections import Counter
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e93c1d7b5a04'
+down_revision = '4b1e6f0a9c27'
+branch_labels = None
+depends_on = None
+
+
+def _fingerprint(user_id, dt, amount, desc, ordinal):
+    # frozen copy of app.dedupe.fingerprint at the time of this migration
+    desc = re.sub(r'\s+', ' ', (desc or '').strip().lower())
+    key  = f"{user_id}|{dt}|{amount:.2f}|{desc}|{ordinal}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def upgrade():
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('fingerprint', sa.String(length=40), nullable=True))
+
+    with op.batch_alter_table('import_job', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('rows_duplicate', sa.Integer(), nullable=False, server_default='0'))
+
+    # backfill existing rows so re-uploads of earlier statements are detected
+    conn = op.get_bind()
+    rows = conn.execute(sa.text(
+        "SELECT id, user_id, date, amount, description, type, transfer_direction "
+        "FROM transactions ORDER BY id"
+    ))
+    seen    = Counter()
+    updates = []
+    for tx_id, user_id, dt, amount, desc, tx_type, direction in rows:
+        amount = float(amount)
+        if tx_type == 'expense' or direction == 'out':
+            amount = -amount
+        key = (user_id, str(dt), round(amount, 2),
+               re.sub(r'\s+', ' ', (desc or '').strip().lower()))
+        updates.append({'id': tx_id,
+                        'fp': _fingerprint(user_id, dt, amount, desc, seen[key])})
+        seen[key] += 1
+    if updates:
+        conn.execute(sa.text("UPDATE transactions SET fingerprint = :fp WHERE id = :id"), updates)
+
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.create_index('ux_transactions_user_fingerprint', ['user_id', 'fingerprint'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.drop_index('ux_transactions_user_fingerprint')
+        batch_op.drop_column('fingerprint')
+
+    with op.batch_alter_table('import_job', schema=None) as batch_op:
+        batch_op.drop_column('rows_duplicate')
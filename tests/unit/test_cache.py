@@ -0,0 +1,160 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+from decimal import Decimal
+
+from werkzeug.security import generate_password_hash
+
+from app import create_app, db
+from sqlalchemy import event
+
+from app.cache import LRUCache, FileCache
+from app.models import User, UserSettings, Transaction, Bill, BillMember
+from app.versions import data_version
+from config import TestConfig
+
+
+class CacheBackendTestCase(unittest.TestCase):
+    def test_lru_evicts_by_size(self):
+        cache = LRUCache(max_bytes=300)
+        for i in range(5):
+            cache.set(f'k{i}', 'x' * 80)
+        cache.get('k2')                      # touch: k2 becomes most recent
+        cache.set('k5', 'x' * 80)
+
+        self.assertLessEqual(cache.size, 300)
+        self.assertEqual(cache.get('k2'), (True, 'x' * 80))
+        self.assertEqual(cache.get('k0'), (False, None))
+        self.assertEqual(cache.info()['hits'], 2)
+        self.assertEqual(cache.info()['misses'], 1)
+
+    def test_file_cache_round_trip_and_prune(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = FileCache(tmp, max_bytes=1000)
+            cache.set('a', {'total': Decimal('1.50')})
+            self.assertEqual(cache.get('a'), (True, {'total': Decimal('1.50')}))
+            self.assertEqual(cache.get('b'), (False, None))
+
+            # a second instance (another worker) sees the same entries
+            self.assertEqual(FileCache(tmp).get('a')[0], True)
+
+            for i in range(20):
+                cache.set(f'k{i}', b'x' * 200)
+            cache.prune()
+            self.assertLessEqual(cache.info()['bytes'], 1000)
+            self.assertFalse(any(name.endswith('.tmp') for name in os.listdir(tmp)))
+
+
+class DataVersionTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        me = User(username='me', email='me@example.com',
+                  password=generate_password_hash('secret'))
+        pal = User(username='pal', email='pal@example.com', password='x')
+        db.session.add_all([me, pal])
+        db.session.commit()
+        self.uid, self.pal_id = me.id, pal.id
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def add_tx(self, amount='10.00'):
+        tx = Transaction(user_id=self.uid, date=date(2025, 3, 1), amount=Decimal(amount),
+                         category='Groceries', type='expense', description='COLES')
+        db.session.add(tx)
+        db.session.commit()
+        return tx
+
+    def test_writes_bump_the_version(self):
+        self.assertEqual(data_version(self.uid), 0)
+        tx = self.add_tx()
+        self.assertEqual(data_version(self.uid), 1)
+
+        tx.category = 'Food'
+        db.session.commit()
+        self.assertEqual(data_version(self.uid), 2)
+
+        db.session.delete(tx)
+        db.session.commit()
+        self.assertEqual(data_version(self.uid), 3)
+
+        db.session.add(UserSettings(user_id=self.uid, monthly_budget=500))
+        db.session.commit()
+        self.assertEqual(data_version(self.uid), 4)
+        self.assertEqual(data_version(self.pal_id), 0)
+
+    def test_deleting_a_bill_bumps_its_members(self):
+        bill = Bill(created_by=self.uid, description='Dinner', total=Decimal('20.00'))
+        db.session.add(bill)
+        db.session.flush()
+        db.session.add(BillMember(bill_id=bill.id, user_id=self.pal_id, share=Decimal('10.00')))
+        db.session.commit()
+        before = data_version(self.pal_id)
+
+        db.session.delete(bill)
+        db.session.commit()
+        self.assertEqual(data_version(self.pal_id), before + 1)
+
+    def test_endpoint_results_are_cached_until_data_changes(self):
+        self.client.post('/login', data={'email': 'me@example.com', 'password': 'secret'})
+        self.add_tx()
+
+        first  = self.client.get('/api/transaction').get_json()
+        second = self.client.get('/api/transaction').get_json()
+        self.assertEqual(first, second)
+        stats = self.client.get('/api/cache/stats').get_json()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+        self.add_tx('5.00')
+        third = self.client.get('/api/transaction').get_json()
+        self.assertEqual(len(third[0]['history']), 2)
+        self.assertEqual(self.client.get('/api/cache/stats').get_json()['misses'], 2)
+
+    def test_cache_stats_are_hidden_outside_debug_and_testing(self):
+        self.client.post('/login', data={'email': 'me@example.com', 'password': 'secret'})
+        self.app.testing = False
+        try:
+            self.assertEqual(self.client.get('/api/cache/stats').status_code, 404)
+        finally:
+            self.app.testing = True
+
+
+    def test_simulate_reuses_the_forecast_until_a_write(self):
+        self.client.post('/login', data={'email': 'me@example.com', 'password': 'secret'})
+        self.add_tx()
+        self.client.get('/api/forecast?months=6')
+
+        statements = []
+        def listener(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            resp = self.client.post('/api/forecast_simulate',
+                                    json={'delta_amount': 50, 'months': 6})
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.get_json()['series']), 6)
+        # forecast and budget come from the cache; only the version is read
+        # (the logged-in user is already on g, as setUp keeps one app context open)
+        self.assertEqual(len(statements), 1)
+        self.assertIn('user_data_version', statements[0])
+
+        before = resp.get_json()['series']
+        db.session.add(Transaction(user_id=self.uid, date=date.today(), amount=Decimal('500.00'),
+                                   category='Groceries', type='expense', description='COLES'))
+        db.session.commit()
+        after = self.client.post('/api/forecast_simulate',
+                                 json={'delta_amount': 50, 'months': 6}).get_json()['series']
+        self.assertNotEqual(before, after)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+from datetime import date
+from decimal import Decimal
+
+from werkzeug.security import generate_password_hash
+
+from app import create_app, db
+from app.models import User, Transaction, Bill, BillMember
+from config import TestConfig
+
+
+class ConditionalGetTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+
+        with self.app.app_context():
+            db.create_all()
+            me  = User(username='me', email='me@example.com',
+                       password=generate_password_hash('secret'))
+            pal = User(username='pal', email='pal@example.com',
+                       password=generate_password_hash('secret'))
+            db.session.add_all([me, pal])
+            db.session.commit()
+            self.uid, self.pal_id = me.id, pal.id
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def login(self, email):
+        client = self.app.test_client()
+        client.post('/login', data={'email': email, 'password': 'secret'})
+        return client
+
+    @staticmethod
+    def etag(resp):
+        return resp.headers['ETag'].strip('"')
+
+    def test_unchanged_data_answers_304(self):
+        client = self.login('me@example.com')
+        for url in ('/api/transaction', '/api/transaction/summary', '/api/forecast',
+                    '/api/friends', '/api/shared_users'):
+            first = client.get(url)
+            self.assertEqual(first.status_code, 200, url)
+            self.assertIn('no-cache', first.headers['Cache-Control'])
+
+            again = client.get(url, headers={'If-None-Match': self.etag(first)})
+            self.assertEqual(again.status_code, 304, url)
+            self.assertEqual(again.data, b'')
+
+        etag = self.etag(client.get('/api/transaction'))
+        with self.app.app_context():
+            db.session.add(Transaction(user_id=self.uid, date=date(2025, 3, 1), amount=Decimal('4.00'),
+                                       category='Groceries', type='expense', description='COLES'))
+            db.session.commit()
+        changed = client.get('/api/transaction', headers={'If-None-Match': etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(len(changed.get_json()), 1)
+
+    def test_friend_links_change_both_users_validators(self):
+        me, pal = self.login('me@example.com'), self.login('pal@example.com')
+        etag = self.etag(pal.get('/api/shared_users'))
+
+        self.assertEqual(me.post('/api/add_friend', json={'friend_id': self.pal_id}).status_code, 201)
+
+        resp = pal.get('/api/shared_users', headers={'If-None-Match': etag})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([u['username'] for u in resp.get_json()], ['me'])
+
+    def test_bill_validator_follows_its_members(self):
+        with self.app.app_context():
+            bill = Bill(created_by=self.uid, description='Dinner', total=Decimal('20.00'))
+            db.session.add(bill)
+            db.session.flush()
+            db.session.add_all([
+                BillMember(bill_id=bill.id, user_id=self.uid, share=Decimal('10.00'),
+                           paid=Decimal('10.00')),
+                BillMember(bill_id=bill.id, user_id=self.pal_id, share=Decimal('10.00'),
+                           paid=Decimal('0.00')),
+            ])
+            db.session.commit()
+            bill_id = bill.id
+        url = f'/api/bill/{bill_id}'
+
+        client = self.login('me@example.com')
+        etag   = self.etag(client.get(url))
+        self.assertEqual(client.get(url, headers={'If-None-Match': etag}).status_code, 304)
+
+        with self.app.app_context():
+            BillMember.query.filter_by(bill_id=bill_id, user_id=self.pal_id).one().paid = Decimal('10.00')
+            db.session.commit()
+        resp = client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.get_json()['members'][1]['paid'], 10.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
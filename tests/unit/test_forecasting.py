@@ -0,0 +1,143 @@
+import unittest
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+
+from app.forecasting import (MODELS, backtest, best_models, category_month_matrix, fit_lines,
+                             forecast_with, holt_winters_batch, linear_forecast, linear_forecast_batch,
+                             median_batch, seasonal_naive_batch)
+
+
+def random_histories(rng):
+    """A (rows × months) matrix drawn from a few spending shapes."""
+    rows, months = rng.integers(1, 30), rng.integers(1, 37)
+    shape = rng.integers(0, 5)
+    if shape == 0:                                   # cents, like real totals
+        return rng.integers(0, 500_000, (rows, months)) / 100
+    if shape == 1:                                   # mostly empty months
+        return np.where(rng.random((rows, months)) < 0.8, 0.0, rng.gamma(2.0, 80.0, (rows, months)))
+    if shape == 2:                                   # flat series
+        return np.repeat(rng.integers(0, 2000, (rows, 1)).astype(float), months, axis=1)
+    if shape == 3:                                   # trend with noise
+        return (rng.normal(0, 50, (rows, 1)) * np.arange(months)
+                + rng.normal(500, 100, (rows, months)))
+    return rng.lognormal(5, 2, (rows, months))      # heavy tailed
+
+
+class LinearForecastBatchTestCase(unittest.TestCase):
+    CASES = 400
+
+    def test_fit_matches_polyfit(self):
+        rng = np.random.default_rng(20)
+        for _ in range(self.CASES):
+            hist = random_histories(rng)
+            if hist.shape[1] < 2:
+                continue
+            w    = np.linspace(0.1, 1.0, hist.shape[1])
+            m, b = fit_lines(hist, w)
+            for i, row in enumerate(hist):
+                ref_m, ref_b = np.polyfit(np.arange(len(row)), row, 1, w=w)
+                scale = max(1.0, np.abs(row).max())
+                self.assertAlmostEqual(m[i] / scale, ref_m / scale, places=9)
+                self.assertAlmostEqual(b[i] / scale, ref_b / scale, places=9)
+
+    def test_batch_matches_linear_forecast(self):
+        rng = np.random.default_rng(21)
+        for _ in range(self.CASES):
+            hist   = random_histories(rng)
+            window = int(rng.integers(3, 37))
+            steps  = int(rng.integers(1, 13))
+            batch  = linear_forecast_batch(hist, steps=steps, window=window)
+            self.assertEqual(batch.shape, (hist.shape[0], steps))
+
+            for row, got in zip(hist, batch):
+                expected = np.array(linear_forecast(list(row), steps=steps, window=window))
+                differs  = got != expected
+                if not differs.any():
+                    continue
+                # the two solvers agree to ~1e-9; a cent can only flip on an exact half-cent
+                tail = row[-window:]
+                w    = np.linspace(0.1, 1.0, len(tail))
+                m, b = np.polyfit(np.arange(len(tail)), tail, 1, w=w)
+                exact = (m * np.arange(len(tail), len(tail) + steps) + b)[differs] * 100
+                np.testing.assert_allclose(np.abs(exact - np.floor(exact) - 0.5), 0, atol=1e-6)
+                np.testing.assert_allclose(got[differs], expected[differs], atol=0.0100001)
+
+    def test_short_histories(self):
+        self.assertEqual(linear_forecast_batch(np.array([[7.5]]), steps=3).tolist(), [[7.5] * 3])
+        self.assertEqual(linear_forecast_batch(np.zeros((2, 0)), steps=2).tolist(), [[0.0] * 2] * 2)
+        self.assertEqual(linear_forecast_batch(np.zeros((0, 12))).shape, (0, 6))
+
+
+
+class CategoryMonthMatrixTestCase(unittest.TestCase):
+    def test_rows_land_on_the_month_grid(self):
+        grid = [date(2024, 11, 1), date(2024, 12, 1), date(2025, 1, 1)]
+        rows = [('rent', 2024, 11, Decimal('900.00')),
+                ('groceries', 2024, 12, Decimal('120.50')),
+                ('rent', 2025, 1, Decimal('950.00')),
+                ('groceries', 2025, 1, Decimal('10.00')),
+                ('groceries', 2025, 1, Decimal('5.00')),
+                ('rent', 2025, 2, Decimal('1.00'))]          # after the grid
+        cats, matrix = category_month_matrix(rows, grid)
+        self.assertEqual(cats, ['rent', 'groceries'])
+        np.testing.assert_array_equal(matrix, [[900.0, 0.0, 950.0], [0.0, 120.5, 15.0]])
+
+    def test_no_rows(self):
+        cats, matrix = category_month_matrix([], [date(2025, 1, 1)] * 4)
+        self.assertEqual((cats, matrix.shape), ([], (0, 4)))
+
+
+class ForecastModelsTestCase(unittest.TestCase):
+    # rent every month plus a December spike, three years
+    seasonal = np.tile([100.0] * 11 + [400.0], 3)[None, :]
+    trend    = (50.0 + 10.0 * np.arange(36))[None, :]
+
+    def test_every_model_has_the_batch_shape(self):
+        hist = np.vstack([self.seasonal, self.trend, np.zeros((1, 36))])
+        for name, model in MODELS.items():
+            for months in (0, 1, 5, 36):
+                fc = model(hist[:, :months], steps=6, window=12)
+                self.assertEqual(fc.shape, (3, 6), (name, months))
+                self.assertFalse(np.isnan(fc).any(), (name, months))
+
+    def test_seasonal_models_repeat_the_year(self):
+        # history ends in December: the next six months are Jan-Jun
+        np.testing.assert_array_equal(seasonal_naive_batch(self.seasonal, steps=12)[0],
+                                      self.seasonal[0, -12:])
+        hw = holt_winters_batch(self.seasonal, steps=12)[0]
+        self.assertEqual(int(np.argmax(hw)), 11)
+        np.testing.assert_allclose(hw, self.seasonal[0, -12:], atol=1.0)
+
+    def test_holt_winters_never_goes_negative(self):
+        falling = (500.0 - 40.0 * np.arange(12))[None, :]
+        self.assertTrue((holt_winters_batch(falling, steps=6) >= 0).all())
+
+    def test_median_of_recent_means(self):
+        hist = np.array([[0.0] * 6 + [10.0] * 3 + [40.0] * 3])
+        # means: last 3 → 40, last 6 → 25, last 12 → 12.5
+        self.assertEqual(median_batch(hist, steps=2).tolist(), [[25.0, 25.0]])
+
+    def test_backtest_picks_the_model_that_fits(self):
+        hist   = np.vstack([self.seasonal, self.trend])
+        errors = backtest(hist, steps=6, window=12)
+        self.assertEqual(set(errors), set(MODELS))
+        self.assertLess(errors['seasonal_naive'][0], errors['linear'][0])
+        self.assertAlmostEqual(errors['linear'][1], 0.0, places=2)
+        best = best_models(errors)
+        self.assertIn(best[0], ('seasonal_naive', 'holt_winters'))
+        self.assertEqual(best[1], 'linear')
+
+        short = backtest(np.ones((2, 4)), steps=6, min_train=6)
+        self.assertTrue(np.isnan(short['linear']).all())
+        self.assertEqual(best_models(short), ['linear', 'linear'])
+
+    def test_forecast_with_mixes_models_per_row(self):
+        hist = np.vstack([self.seasonal, self.trend])
+        out  = forecast_with(hist, ['seasonal_naive', 'linear'], steps=6, window=12)
+        np.testing.assert_array_equal(out[0], seasonal_naive_batch(self.seasonal)[0])
+        np.testing.assert_array_equal(out[1], linear_forecast_batch(self.trend)[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,248 @@
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from app import create_app, db
+from app.categorizer import (VENDOR_MAP, VendorCategorizer, categorize_by_vendor, learned_lookup,
+                             remember_category)
+from app.dedupe import DATE_WINDOW, DuplicateFilter, fingerprint
+from app.importer import import_csv, iter_chunks, ImportReport, PARSERS, write_parsed
+from app.models import User, Transaction, TransactionType
+from app import sniffer
+from app.sniffer import sniff_file
+from config import TestConfig
+
+
+def make_reader(text):
+    layout, reader = sniff_file(StringIO(text))
+    return reader, layout, layout.missing
+
+
+class ImportTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        u = User(username='imp', email='imp@example.com', password='hash')
+        db.session.add(u)
+        db.session.commit()
+        self.uid = u.id
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_learned_categories_are_read_fresh_per_import(self):
+        first = learned_lookup(self.uid)
+        self.assertIsNone(first('GYM DIRECT DEBIT 0412'))
+
+        remember_category(self.uid, 'Gym direct debit 0299', 'Fitness')
+        db.session.commit()
+        self.assertIsNone(first('GYM DIRECT DEBIT 0412'))          # memoized for this import
+        self.assertEqual(learned_lookup(self.uid)('GYM DIRECT DEBIT 0412'), 'Fitness')
+        self.assertIsNone(learned_lookup(self.uid + 1)('GYM DIRECT DEBIT 0412'))
+
+    def test_layout_reports_missing(self):
+        _, layout, missing = make_reader('Date,Amount,Balance\n')
+        self.assertEqual(layout.columns, {'date': 0, 'amount': 1, 'balance': 2})
+        self.assertEqual(missing, ['description'])
+
+    def test_rows_are_written_in_chunks(self):
+        lines = ['Date,Amount,Description']
+        lines += [f'{d:02d}/01/2025,-{d}.50,Coffee' for d in range(1, 26)]
+        reader, layout, _ = make_reader('\n'.join(lines))
+
+        report = import_csv(reader, layout, self.uid, chunk_size=10)
+
+        self.assertEqual(report.parsed, 25)
+        self.assertEqual(report.inserted, 25)
+        self.assertEqual(report.chunks, 3)
+        self.assertEqual(Transaction.query.filter_by(user_id=self.uid).count(), 25)
+
+    def test_bad_rows_are_reported_not_inserted(self):
+        reader, layout, _ = make_reader(
+            'Date,Amount,Description\n'
+            '01/02/2025,"-1,250.00",Rent\n'
+            '2025-02-02,-10,Coffee\n'
+            '03/02/2025,abc,Lunch\n'
+            '04/02/2025,300,Transfer from savings\n'
+        )
+
+        report = import_csv(reader, layout, self.uid,
+                            categorize=lambda d: 'Housing' if d == 'Rent' else None)
+
+        self.assertEqual(report.inserted, 2)
+        self.assertEqual(report.rejected, 2)
+        self.assertEqual([(e['line'], e['field']) for e in report.errors],
+                         [(3, 'date'), (4, 'amount')])
+
+        rent = Transaction.query.filter_by(description='Rent').one()
+        self.assertEqual(rent.amount, Decimal('1250.00'))
+        self.assertEqual(rent.category, 'Housing')
+        self.assertEqual(rent.type, TransactionType.expense)
+        self.assertEqual(rent.date, date(2025, 2, 1))
+
+        transfer = Transaction.query.filter_by(type=TransactionType.transfer).one()
+        self.assertEqual(transfer.transfer_direction, 'in')
+        self.assertEqual(transfer.category, 'Transfer (In)')
+
+    def test_reupload_skips_already_imported_rows(self):
+        first = ('Date,Amount,Description\n'
+                 '01/03/2025,-4.50,Coffee\n'
+                 '01/03/2025,-4.50,Coffee\n'
+                 '02/03/2025,-60.00,Coles\n')
+        # overlapping export: same three lines plus one new one
+        second = first + '03/03/2025,-12.00,Uber\n'
+
+        reader, layout, _ = make_reader(first)
+        report = import_csv(reader, layout, self.uid)
+        # identical rows inside one file are both kept (ordinal 0 and 1)
+        self.assertEqual((report.inserted, report.duplicates), (3, 0))
+
+        reader, layout, _ = make_reader(second)
+        report = import_csv(reader, layout, self.uid, chunk_size=2)
+        self.assertEqual((report.inserted, report.duplicates), (1, 3))
+        self.assertEqual(Transaction.query.filter_by(user_id=self.uid).count(), 4)
+
+    def test_ordinal_state_is_bounded_by_the_date_window(self):
+        dupes = DuplicateFilter(self.uid)
+        rows  = [{'date': date(2025, 1, 1) + timedelta(days=d), 'amount': Decimal('4.50'),
+                  'type': 'expense', 'description': 'Coffee'}
+                 for d in range(200) for _ in range(2)]
+        dupes.assign(rows)
+        self.assertLessEqual(len(dupes.seen), DATE_WINDOW)
+        # the two coffees of each day still get ordinals 0 and 1
+        self.assertEqual(len({r['fingerprint'] for r in rows}), len(rows))
+        self.assertEqual(rows[1]['fingerprint'],
+                         fingerprint(self.uid, date(2025, 1, 1), Decimal('-4.50'), 'coffee', 1))
+
+    def test_batch_files_are_checked_against_each_other(self):
+        text = 'Date,Amount,Description\n01/03/2025,-4.50,Coffee\n02/03/2025,-60.00,Coles\n'
+        reports = []
+        for _ in range(2):                      # the same statement twice in one batch
+            reader, layout, _ = make_reader(text)
+            report = ImportReport()
+            chunks = [PARSERS['rows'](chunk, layout, None, report) for chunk in iter_chunks(reader, 100)]
+            reports.append(write_parsed(chunks, self.uid, report))
+        self.assertEqual([(r.inserted, r.duplicates) for r in reports], [(2, 0), (0, 2)])
+
+    def test_repeated_fingerprint_within_a_chunk_is_inserted_once(self):
+        rows = [{'date': date(2025, 3, 1), 'amount': Decimal('4.50'), 'type': 'expense',
+                 'description': 'Coffee', 'fingerprint': 'f' * 40, 'category': 'Food'}] * 2
+        new_rows, _, dup_lines = DuplicateFilter(self.uid).split(rows, [2, 3])
+        self.assertEqual((len(new_rows), dup_lines), (1, [3]))
+
+    def test_columnar_parse_matches_row_parse(self):
+        text = ('Date,Amount,Description\n'
+                '01/02/2025,"-1,250.00",Rent\n'
+                '31/04/2025,-10,Coffee\n'
+                '3/2/2025,abc,Lunch\n'
+                '04/02/2025,300,Transfer from savings\n'
+                '05/02/2025,-20,transfer to Bob\n'
+                '06/02/2025,0,Refund\n'
+                '07/02/2025,-4.5,Rent\n')
+        categorize = lambda d: 'Housing' if d == 'Rent' else None
+
+        results = {}
+        for mode in ('rows', 'columnar'):
+            reader, layout, _ = make_reader(text)
+            report = ImportReport()
+            chunk  = next(iter_chunks(reader, 100))
+            rows, lines = PARSERS[mode](chunk, layout, categorize, report)
+            results[mode] = (rows, lines, report.as_dict())
+
+        self.assertEqual(results['rows'], results['columnar'])
+        self.assertEqual(results['columnar'][2]['rejected'], 2)
+
+
+class SnifferTestCase(unittest.TestCase):
+    def setUp(self):
+        sniffer.clear_cache()
+
+    def test_semicolon_file_with_iso_dates(self):
+        layout, reader = sniff_file(StringIO(
+            'Booking Date;Payee;Value;Balance\n'
+            '2025-03-01;COLES 123;-12.50;987.50\n'
+            '2025-03-14;SALARY;3000.00;3987.50\n'))
+        self.assertEqual(layout.delimiter, ';')
+        self.assertEqual(layout.columns,
+                         {'date': 0, 'description': 1, 'amount': 2, 'balance': 3})
+        self.assertEqual(layout.date_format, '%Y-%m-%d')
+        self.assertEqual(next(reader)[1], 'COLES 123')
+
+    def test_headerless_file_is_inferred_from_content(self):
+        layout, reader = sniff_file(StringIO(
+            '01/03/2025,COLES 123,-12.50,987.50\n'
+            '14/03/2025,SALARY ACME,3000.00,3987.50\n'
+            '15/03/2025,UBER TRIP,-20.00,3967.50\n'))
+        self.assertFalse(layout.has_header)
+        self.assertEqual(layout.columns,
+                         {'date': 0, 'amount': 2, 'balance': 3, 'description': 1})
+        self.assertEqual(layout.date_format, '%d/%m/%Y')
+        self.assertEqual(next(reader)[0], '01/03/2025')
+
+    def test_partial_header_falls_back_to_content(self):
+        # sampledata/noheader.csv: only the amount column is labelled
+        layout, _ = sniff_file(StringIO(
+            ',Amount,,\n'
+            '2025-01-01,141.45,Utilities,641.45\n'
+            '2025-01-02,-118.72,Insurance,522.73\n'))
+        self.assertTrue(layout.has_header)
+        self.assertEqual(layout.columns,
+                         {'amount': 1, 'date': 0, 'balance': 3, 'description': 2})
+        self.assertEqual(layout.date_format, '%Y-%m-%d')
+
+    def test_month_first_dates(self):
+        layout, _ = sniff_file(StringIO('Date,Amount,Description\n'
+                                        '03/04/2025,-1,a\n'
+                                        '03/25/2025,-1,b\n'))
+        self.assertEqual(layout.date_format, '%m/%d/%Y')
+
+    def test_layout_is_cached_by_header(self):
+        text = 'Date,Amount,Description\n01/03/2025,-1,a\n'
+        first, _  = sniff_file(StringIO(text))
+        second, _ = sniff_file(StringIO(text))
+        self.assertIs(first, second)
+
+    def test_cached_layout_redetects_the_date_format(self):
+        sniff_file(StringIO('Date,Amount,Description\n25/03/2025,-1,a\n'))
+        layout, _ = sniff_file(StringIO('Date,Amount,Description\n2025-03-25,-1,a\n'))
+        self.assertEqual(layout.date_format, '%Y-%m-%d')
+        again, _ = sniff_file(StringIO('Date,Amount,Description\n26/03/2025,-1,b\n'))
+        self.assertEqual(again.date_format, '%d/%m/%Y')
+
+
+class VendorCategorizerTestCase(unittest.TestCase):
+    def test_matches_whole_words_only(self):
+        self.assertEqual(categorize_by_vendor('POS COLES 0412 PERTH'), 'Groceries')
+        self.assertEqual(categorize_by_vendor('Uber *trip'), 'Transport')
+        self.assertIsNone(categorize_by_vendor('Shellfish market'))
+        self.assertIsNone(categorize_by_vendor(''))
+
+    def test_first_vendor_in_table_wins(self):
+        engine = VendorCategorizer({'shell': 'Fuel', 'coles express': 'Groceries'})
+        self.assertEqual(engine.categorize('COLES EXPRESS SHELL'), 'Fuel')
+
+        # a vendor that is a word-prefix of a longer one at the same position
+        engine = VendorCategorizer({'shell': 'Fuel', 'shell garage': 'Auto'})
+        self.assertEqual(engine.categorize('shell garage'), 'Fuel')
+        engine = VendorCategorizer({'shell garage': 'Auto', 'shell': 'Fuel'})
+        self.assertEqual(engine.categorize('shell garage'), 'Auto')
+        self.assertEqual(engine.categorize('shell station'), 'Fuel')
+
+    def test_rebuild_replaces_table(self):
+        engine = VendorCategorizer(VENDOR_MAP)
+        self.assertEqual(engine.categorize('netflix.com'), 'Entertainment')
+        engine.rebuild({'netflix': 'Subscriptions', 'c++ books': 'Books'})
+        self.assertEqual(engine.categorize('netflix.com'), 'Subscriptions')
+        self.assertEqual(engine.categorize('C++ Books Perth'), 'Books')
+        self.assertIsNone(engine.categorize('coles'))
+        self.assertEqual(len(engine), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import json
+import unittest
+from datetime import date, datetime
+from decimal import Decimal
+
+import numpy as np
+
+from app import create_app, db
+from app.models import TransactionType
+from config import TestConfig
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JSONProviderTestCase(unittest.TestCase):
+    payload = {
+        'amount':  Decimal('12.50'),
+        'date':    date(2025, 3, 1),
+        'created': datetime(2025, 3, 1, 9, 30),
+        'type':    TransactionType.expense,
+        'series':  np.array([1.5, 2.0]),
+        'count':   np.int64(3),
+        'nested':  [{'total': Decimal('-0.10')}],
+    }
+    expected = {
+        'amount': 12.5, 'date': '2025-03-01', 'created': '2025-03-01T09:30:00',
+        'type': 'expense', 'series': [1.5, 2.0], 'count': 3, 'nested': [{'total': -0.1}],
+    }
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+
+    def test_stdlib_fallback(self):
+        self.app.json.use_orjson = False
+        self.assertEqual(json.loads(self.app.json.dumps(self.payload)), self.expected)
+
+    @unittest.skipIf(orjson is None, 'orjson not installed')
+    def test_orjson_matches_fallback(self):
+        fast = self.app.json.dumps(self.payload)
+        self.app.json.use_orjson = False
+        self.assertEqual(fast, json.dumps(json.loads(self.app.json.dumps(self.payload)),
+                                          sort_keys=True, separators=(',', ':')))
+
+    def test_non_finite_floats_are_null_on_both_paths(self):
+        payload = {'nan': float('nan'), 'inf': float('-inf'), 'dec': Decimal('Infinity'),
+                   'series': np.array([1.0, np.nan]), 'scalar': np.float64('inf')}
+        expected = {'nan': None, 'inf': None, 'dec': None, 'series': [1.0, None], 'scalar': None}
+        if orjson is not None:
+            self.assertEqual(json.loads(self.app.json.dumps(payload)), expected)
+        self.app.json.use_orjson = False
+        self.assertEqual(json.loads(self.app.json.dumps(payload)), expected)
+
+    def test_jsonify_rows(self):
+        with self.app.app_context():
+            db.create_all()
+            row = db.session.execute(db.select(db.literal(Decimal('1.25')).label('amount'),
+                                               db.literal(date(2025, 1, 2)).label('date'))).one()
+            resp = self.app.json.response([row])
+            db.drop_all()
+        self.assertEqual(resp.mimetype, 'application/json')
+        self.assertEqual(json.loads(resp.get_data()), [{'amount': 1.25, 'date': '2025-01-02'}])
+
+    def test_unknown_types_still_raise(self):
+        with self.assertRaises(TypeError):
+            self.app.json.dumps({'x': object()})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from datetime import date
+from decimal import Decimal
+
+from werkzeug.security import generate_password_hash
+
+from app import create_app, db
+from app.models import User, Transaction, TransactionType, MonthlyRollup
+from app.queries import category_history, recent_transactions, match_candidates
+from config import TestConfig
+
+
+class ReadQueriesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            me = User(username='me', email='me@example.com',
+                      password=generate_password_hash('secret'))
+            db.session.add(me)
+            db.session.commit()
+            self.uid = me.id
+
+            for d, desc, tx_type in [(1, 'TRANSFER TO ALEX SMITH', 'transfer'),
+                                     (2, 'TRANSFER TO ALEX SMITH JUNE', 'transfer'),
+                                     (3, 'COLES 123', 'expense'),
+                                     (4, 'SALARY', 'income')]:
+                db.session.add(Transaction(user_id=me.id, date=date(2025, 6, d), amount=Decimal('20.00'),
+                                           category=tx_type, type=tx_type, description=desc))
+            db.session.commit()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def test_helpers_return_rows_not_entities(self):
+        with self.app.app_context():
+            recent = recent_transactions(self.uid, [TransactionType.expense, TransactionType.income])
+            self.assertEqual([r.description for r in recent], ['SALARY', 'COLES 123'])
+            self.assertIsInstance(recent[0].type, TransactionType)
+            self.assertNotIsInstance(recent[0], Transaction)
+            self.assertEqual(len(db.session.identity_map), 0)
+
+            history = category_history(self.uid, per_category=1)
+            self.assertEqual([(r.cat, r.date.day) for r in history],
+                             [('transfer', 2), ('expense', 3), ('income', 4)])
+
+            candidates = match_candidates(self.uid, exclude_id=1)
+            self.assertEqual(sorted(r.id for r in candidates), [2, 3, 4])
+
+    def test_history_groups_categories_like_the_rollup(self):
+        with self.app.app_context():
+            for d, category in [(10, 'CAFÉ'), (11, ' Café\t'), (12, '\ncafé')]:
+                db.session.add(Transaction(user_id=self.uid, date=date(2025, 6, d), amount=Decimal('4.50'),
+                                           category=category, type='expense', description='CAFE'))
+            db.session.commit()
+
+            history = category_history(self.uid, per_category=2)
+            cafe    = [r for r in history if r.cat not in ('transfer', 'expense', 'income')]
+            self.assertEqual([(r.cat, r.date.day) for r in cafe], [('café', 11), ('café', 12)])
+            buckets = {r.category for r in MonthlyRollup.query.filter_by(user_id=self.uid, month=6)}
+            self.assertIn('café', buckets)
+            self.assertEqual({r.cat for r in history} - buckets, set())
+
+    def test_suggest_friends_uses_projected_rows(self):
+        self.client.post('/login', data={'email': 'me@example.com', 'password': 'secret'})
+        resp = self.client.get('/api/bill/suggest_friends/1')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([(s['id'], s['date'], s['amount']) for s in resp.get_json()],
+                         [(2, '2025-06-02', 20.0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import re
+import unittest
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import event
+from werkzeug.security import generate_password_hash
+
+from app import create_app, db
+from app.models import (User, Transaction, TransactionType, TransactionFriend,
+                        Bill, BillMember, BillTransaction)
+from config import TestConfig
+
+INDEXED_TABLES = ('transactions', 'transaction_friend', 'bill_transaction', 'bill_member')
+FULL_SCAN = re.compile(r'^SCAN (%s)\b' % '|'.join(INDEXED_TABLES))
+
+
+class QueryPlanTestCase(unittest.TestCase):
+    """
+    Every statement the hot pages send against the big tables must be
+    answered from an index: EXPLAIN QUERY PLAN may SEARCH them but never SCAN.
+    """
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            me     = User(username='me', email='me@example.com',
+                          password=generate_password_hash('secret'))
+            friend = User(username='pal', email='pal@example.com', password='x')
+            db.session.add_all([me, friend])
+            db.session.commit()
+
+            txs = [Transaction(user_id=me.id, date=date(2025, m, 1), amount=Decimal('10.00'),
+                               category='Groceries', type=TransactionType.expense,
+                               description=f'COLES {m}')
+                   for m in range(1, 13)]
+            db.session.add_all(txs)
+            db.session.flush()
+            db.session.add(TransactionFriend(transaction_id=txs[0].id, friend_id=friend.id))
+
+            bill = Bill(created_by=me.id, description='Dinner', total=Decimal('20.00'))
+            db.session.add(bill)
+            db.session.flush()
+            db.session.add_all([
+                BillMember(bill_id=bill.id, user_id=me.id, share=Decimal('10.00')),
+                BillMember(bill_id=bill.id, user_id=friend.id, share=Decimal('10.00')),
+                BillTransaction(bill_id=bill.id, transaction_id=txs[1].id,
+                                amount_applied=Decimal('5.00')),
+            ])
+            db.session.commit()
+            self.bill_id = bill.id
+
+        self.client.post('/login', data={'email': 'me@example.com', 'password': 'secret'})
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def captured(self, url):
+        """(sql, params) of every statement sent while serving `url`."""
+        statements = []
+
+        def listener(conn, cursor, statement, parameters, context, executemany):
+            if not executemany and statement.lstrip().upper().startswith('SELECT'):
+                statements.append((statement, parameters))
+
+        with self.app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', listener)
+            try:
+                resp = self.client.get(url)
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', listener)
+        self.assertEqual(resp.status_code, 200, url)
+        return statements
+
+    def plan(self, sql, params):
+        with self.app.app_context():
+            rows = db.session.connection().exec_driver_sql('EXPLAIN QUERY PLAN ' + sql, params)
+            return [r[-1] for r in rows]
+
+    def test_hot_queries_use_indexes(self):
+        urls = ['/dashboard', '/api/transaction', '/splitBill', f'/bill/{self.bill_id}']
+        checked = 0
+        for url in urls:
+            for sql, params in self.captured(url):
+                if not any(re.search(rf'\b{t}\b', sql) for t in INDEXED_TABLES):
+                    continue
+                plan  = self.plan(sql, params)
+                scans = [p for p in plan if FULL_SCAN.match(p)]
+                self.assertEqual(scans, [], f'{url}: {sql}\n{plan}')
+                checked += 1
+        self.assertGreaterEqual(checked, len(urls))
+
+    def test_history_page_query_uses_index(self):
+        # /history's template needs CSRF, which TestConfig turns off
+        with self.app.app_context():
+            stmt = (Transaction.query.filter_by(user_id=1)
+                    .order_by(Transaction.date.desc()).limit(20).statement)
+            sql  = str(stmt.compile(db.engine, compile_kwargs={'literal_binds': True}))
+        plan = self.plan(sql, ())
+        self.assertTrue(any('ix_transactions_user_date' in p for p in plan), plan)
+        self.assertFalse(any('TEMP B-TREE' in p for p in plan), plan)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from app import create_app, db
+from app.importer import import_csv
+from app.models import User, Transaction, TransactionType, MonthlyRollup
+from app.rollup import rebuild
+from app.versions import data_version
+from app.sniffer import sniff_file
+from config import TestConfig
+
+
+def rollup_snapshot():
+    return {(r.user_id, r.year, r.month, r.type, r.category): (r.total, r.count)
+            for r in MonthlyRollup.query.all()}
+
+
+class RollupTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        u = User(username='roll', email='roll@example.com', password='hash')
+        db.session.add(u)
+        db.session.commit()
+        self.uid = u.id
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def add(self, d, amount, category, tx_type=TransactionType.expense):
+        tx = Transaction(user_id=self.uid, date=d, amount=amount,
+                         category=category, type=tx_type, description=category)
+        db.session.add(tx)
+        db.session.commit()
+        return tx
+
+    def assertMatchesRebuild(self):
+        incremental = rollup_snapshot()
+        rebuild()
+        self.assertEqual(incremental, rollup_snapshot())
+
+    def test_orm_insert_update_delete(self):
+        a = self.add(date(2025, 3, 2), Decimal('10.00'), 'Groceries')
+        self.add(date(2025, 3, 9), Decimal('5.50'), ' groceries ')
+        b = self.add(date(2025, 4, 1), Decimal('7.25'), 'Fuel')
+
+        self.assertEqual(rollup_snapshot()[(self.uid, 2025, 3, 'expense', 'groceries')],
+                         (Decimal('15.50'), 2))
+
+        # recategorize, move to another month and change the amount
+        a.category = 'Dining'
+        db.session.commit()
+        b.date   = date(2025, 5, 1)
+        b.amount = Decimal('8.00')
+        db.session.commit()
+
+        snap = rollup_snapshot()
+        self.assertEqual(snap[(self.uid, 2025, 3, 'expense', 'groceries')], (Decimal('5.50'), 1))
+        self.assertEqual(snap[(self.uid, 2025, 3, 'expense', 'dining')], (Decimal('10.00'), 1))
+        self.assertNotIn((self.uid, 2025, 4, 'expense', 'fuel'), snap)
+        self.assertMatchesRebuild()
+
+        db.session.delete(a)
+        db.session.commit()
+        self.assertNotIn((self.uid, 2025, 3, 'expense', 'dining'), rollup_snapshot())
+        self.assertMatchesRebuild()
+
+    def test_rolled_back_changes_leave_rollup_alone(self):
+        self.add(date(2025, 3, 2), Decimal('10.00'), 'Groceries')
+        before = rollup_snapshot()
+
+        db.session.add(Transaction(user_id=self.uid, date=date(2025, 3, 3), amount=1,
+                                   category='Groceries', type='expense'))
+        db.session.flush()
+        db.session.rollback()
+        self.assertEqual(rollup_snapshot(), before)
+
+    def test_bulk_import_updates_rollup(self):
+        layout, reader = sniff_file(StringIO('Date,Amount,Description\n'
+                                             '01/03/2025,-4.50,Coffee\n'
+                                             '02/03/2025,-60.00,Coles\n'
+                                             '03/03/2025,250.00,Refund\n'))
+        import_csv(reader, layout, self.uid, categorize=lambda d: 'Food' if d == 'Coffee' else None)
+
+        snap = rollup_snapshot()
+        self.assertEqual(snap[(self.uid, 2025, 3, 'expense', 'food')], (Decimal('4.50'), 1))
+        self.assertEqual(snap[(self.uid, 2025, 3, 'income', 'income')], (Decimal('250.00'), 1))
+        self.assertMatchesRebuild()
+
+    def test_rebuild_command(self):
+        self.add(date(2025, 3, 2), Decimal('10.00'), 'Groceries')
+        MonthlyRollup.query.delete()
+        db.session.commit()
+
+        result = self.app.test_cli_runner().invoke(args=['rollup', 'rebuild'])
+        self.assertIn('Rebuilt 1 monthly buckets', result.output)
+        self.assertEqual(rollup_snapshot(),
+                         {(self.uid, 2025, 3, 'expense', 'groceries'): (Decimal('10.00'), 1)})
+
+    def test_rebuild_bumps_the_data_version(self):
+        self.add(date(2025, 3, 2), Decimal('10.00'), 'Groceries')
+        before = data_version(self.uid)
+        rebuild()
+        db.session.commit()
+        self.assertEqual(data_version(self.uid), before + 1)
+        rebuild(self.uid)
+        db.session.commit()
+        self.assertEqual(data_version(self.uid), before + 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
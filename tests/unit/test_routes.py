@@ -130,6 +130,266 @@ class RoutesTestCase(unittest.TestCase):
             self.assertIsNotNone(tx)
             self.assertEqual(tx.amount, Decimal('100.00'))
 
+    def test_csv_import_job_status(self):
+        self.client.post('/login', data={
+            'email': 't@example.com',
+            'password': 'secret'
+        }, follow_redirects=True)
+
+        data = {
+            'csv_file': (BytesIO(b'Date,Amount,Description\n'
+                                 b'14/05/2025,-12.50,Coffee\n'
+                                 b'not-a-date,-3.00,Bus\n'), 'transactions.csv')
+        }
+        resp = self.client.post('/transactionForm', data=data, content_type='multipart/form-data')
+        self.assertEqual(resp.status_code, 302)
+        job_id = resp.headers['Location'].split('job_id=')[1]
+
+        status = self.client.get(f'/api/import/{job_id}').get_json()
+        self.assertEqual(status['status'], 'done')
+        self.assertEqual(status['rows_parsed'], 2)
+        self.assertEqual(status['rows_inserted'], 1)
+        self.assertEqual(status['rows_rejected'], 1)
+        self.assertIn('bad date', status['errors'][0])
+
+    def test_dashboard_totals_single_query(self):
+        from datetime import date
+        from dateutil.relativedelta import relativedelta
+        from sqlalchemy import event
+        from app.routes import dashboard_totals, gather_dashboard_data
+
+        this_month = date.today().replace(day=1)
+        last_month = this_month - relativedelta(months=1)
+        with self.app.app_context():
+            u = User.query.filter_by(email='t@example.com').one()
+            for d, amt, cat, tx_type in [
+                    (this_month, 30, 'Groceries', 'expense'),
+                    (this_month, 20, 'Fuel', 'expense'),
+                    (last_month, 25, 'Groceries', 'expense'),
+                    (this_month, 300, 'savings', 'income'),
+                    (last_month, 200, 'savings', 'income'),
+                    (last_month - relativedelta(months=1), 999, 'Groceries', 'expense')]:
+                db.session.add(Transaction(user_id=u.id, date=d, amount=amt,
+                                           category=cat, type=tx_type, description=cat))
+            db.session.commit()
+
+            totals = dashboard_totals(u.id)
+            self.assertEqual(totals[('expense', 'Groceries')], (Decimal('30'), Decimal('25')))
+            self.assertEqual(totals[('expense', 'Fuel')], (Decimal('20'), Decimal('0')))
+
+            statements = []
+            listener = lambda *args: statements.append(args[2])
+            event.listen(db.engine, 'before_cursor_execute', listener)
+            try:
+                data = gather_dashboard_data(u)
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', listener)
+
+            self.assertEqual(len([s for s in statements if 'FROM transactions' in s]), 1)
+            self.assertEqual(data['total_expenses'], Decimal('50'))
+            self.assertEqual(data['exp_pct_change'], Decimal('100.0'))
+            self.assertEqual(data['savings'], Decimal('300'))
+            self.assertEqual(data['sav_pct_change'], Decimal('50.0'))
+
+    def test_transaction_summary(self):
+        from datetime import date
+        with self.app.app_context():
+            u = User.query.filter_by(email='t@example.com').one()
+            rows = [(date(2025, 1, d), 10, 'Groceries', 'expense') for d in (3, 9, 20)]
+            rows += [(date(2025, 2, 1), 5, ' groceries', 'expense'),
+                     (date(2025, 2, 2), 1000, 'income', 'income')]
+            for d, amt, cat, tx_type in rows:
+                db.session.add(Transaction(user_id=u.id, date=d, amount=amt, category=cat,
+                                           type=tx_type, description=f'{cat} {d}'))
+            other = User(username='other', email='o@example.com', password='x')
+            db.session.add(other)
+            db.session.commit()
+            other_id = other.id
+
+        self.client.post('/login', data={'email': 't@example.com', 'password': 'secret'})
+        summary = self.client.get('/api/transaction/summary?recent=2').get_json()
+
+        cats = {(c['type'], c['category']): c for c in summary['categories']}
+        groceries = cats[('expense', 'groceries')]
+        self.assertEqual((groceries['total'], groceries['count']), (35.0, 4))
+        self.assertEqual([h['date'] for h in groceries['history']], ['2025-01-20', '2025-02-01'])
+        self.assertEqual(cats[('income', 'income')]['total'], 1000.0)
+        self.assertEqual(summary['monthly_expenses'],
+                         {'labels': ['2025-01', '2025-02'], 'totals': [30.0, 5.0]})
+
+        resp = self.client.get(f'/api/transaction/summary?view_user_id={other_id}')
+        self.assertEqual(resp.status_code, 403)
+
+    def test_transaction_history_keeps_latest_per_category(self):
+        from datetime import date, timedelta
+        from app.routes import transaction_history
+        with self.app.app_context():
+            u = User.query.filter_by(email='t@example.com').one()
+            start = date(2025, 1, 1)
+            for i in range(5):
+                db.session.add(Transaction(user_id=u.id, date=start + timedelta(days=i), amount=10,
+                                           category='Groceries' if i % 2 else ' groceries ',
+                                           type='expense', description=f'COLES {i}'))
+            db.session.add(Transaction(user_id=u.id, date=date(2025, 1, 3), amount=900,
+                                       category='income', type='income', description='PAY'))
+            db.session.commit()
+
+            history = transaction_history(u.id, per_category=3)
+
+        self.assertEqual([c['category'] for c in history], ['groceries', 'income'])
+        self.assertEqual([h['description'] for h in history[0]['history']],
+                         ['COLES 2', 'COLES 3', 'COLES 4'])
+        self.assertEqual(history[1]['history'][0]['amount'], 900.0)
+
+    def test_ndjson_streaming(self):
+        from datetime import date
+        with self.app.app_context():
+            u = User.query.filter_by(email='t@example.com').one()
+            for d in (5, 1, 9):
+                db.session.add(Transaction(user_id=u.id, date=date(2025, 3, d), amount=d,
+                                           category='Groceries', type='expense',
+                                           description=f'COLES {d}'))
+            db.session.commit()
+
+        self.client.post('/login', data={'email': 't@example.com', 'password': 'secret'})
+        resp = self.client.get('/api/transaction?format=ndjson')
+        self.assertTrue(resp.is_streamed)
+        self.assertEqual(resp.mimetype, 'application/x-ndjson')
+        lines = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+        self.assertEqual([l['date'] for l in lines], ['2025-03-01', '2025-03-05', '2025-03-09'])
+        self.assertEqual(lines[0]['category'], 'groceries')
+
+        resp = self.client.get('/api/transaction/export')
+        self.assertIn('attachment', resp.headers['Content-Disposition'])
+        lines = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+        self.assertEqual([(l['amount'], l['category']) for l in lines],
+                         [(1.0, 'Groceries'), (5.0, 'Groceries'), (9.0, 'Groceries')])
+
+    def test_forecast_simulate_batch_matches_single(self):
+        from datetime import date
+        from dateutil.relativedelta import relativedelta
+        from app.models import UserSettings
+        with self.app.app_context():
+            u = User.query.filter_by(email='t@example.com').one()
+            db.session.add(UserSettings(user_id=u.id, monthly_budget=Decimal('400.00')))
+            month = date.today().replace(day=1)
+            for i in range(6):
+                d = month - relativedelta(months=i)
+                db.session.add_all([
+                    Transaction(user_id=u.id, date=d, amount=100 + 20 * i, category='Groceries',
+                                type='expense', description='COLES'),
+                    Transaction(user_id=u.id, date=d, amount=150, category='Rent',
+                                type='expense', description='RENT'),
+                ])
+            db.session.commit()
+
+        self.client.post('/login', data={'email': 't@example.com', 'password': 'secret'})
+        deltas, cats = [-50, 0, 100], [None, 'groceries', 'missing']
+        batch = self.client.post('/api/forecast_simulate/batch',
+                                 json={'deltas': deltas, 'categories': cats, 'months': 6}).get_json()
+        self.assertEqual(len(batch['months']), 6)
+        self.assertEqual(len(batch['over_budget']), len(deltas))
+
+        overall = self.client.get('/api/forecast?months=6').get_json()['overall']
+        for j, delta in enumerate(deltas):
+            self.assertEqual(batch['over_budget'][j], [v + delta > 400 for v in overall])
+            for i, cat in enumerate(cats):
+                single = self.client.post('/api/forecast_simulate', json={
+                    'delta_amount': delta, 'category': cat, 'months': 6}).get_json()
+                self.assertEqual(batch['series'][i][j], single['series'])
+                self.assertEqual(batch['advice'][i][j], single['advice'])
+
+        for bad in ({'deltas': []}, {'deltas': ['x']}, {'deltas': [1] * 6000},
+                    {'deltas': [1], 'categories': [['groceries']]},
+                    {'deltas': [1], 'categories': [{'a': 1}, 3]},
+                    {'deltas': [1], 'categories': 'groceries'}):
+            resp = self.client.post('/api/forecast_simulate/batch', json=bad)
+            self.assertEqual(resp.status_code, 400)
+
+    def test_forecast_models(self):
+        from datetime import date
+        from dateutil.relativedelta import relativedelta
+        with self.app.app_context():
+            u = User.query.filter_by(email='t@example.com').one()
+            month = date.today().replace(day=1)
+            for i in range(30):
+                d = month - relativedelta(months=i)
+                db.session.add(Transaction(user_id=u.id, date=d, amount=400 if d.month == 12 else 100,
+                                           category='Rent', type='expense', description='RENT'))
+            db.session.commit()
+
+        self.client.post('/login', data={'email': 't@example.com', 'password': 'secret'})
+        linear = self.client.get('/api/forecast').get_json()
+        self.assertEqual(linear['models'], {'rent': 'linear'})
+
+        auto = self.client.get('/api/forecast?model=auto').get_json()
+        backtest = self.client.get('/api/forecast/backtest').get_json()
+        self.assertEqual(auto['models']['rent'], backtest['best']['rent'])
+        scores = backtest['categories']['rent']
+        self.assertEqual(min(scores, key=scores.get), backtest['best']['rent'])
+        self.assertEqual(len(auto['overall']), 6)
+
+        self.assertEqual(self.client.get('/api/forecast?model=nope').status_code, 400)
+
+    def test_multi_file_csv_import(self):
+        self.client.post('/login', data={
+            'email': 't@example.com',
+            'password': 'secret'
+        }, follow_redirects=True)
+
+        data = {'csv_files': [
+            (BytesIO(b'Date,Amount,Description\n14/05/2025,-12.50,Coffee\n'), 'everyday.csv'),
+            (BytesIO(b'Booking Date;Payee;Value\n2025-05-15;COLES 12;-40.00\n'
+                     b'2025-05-16;Refund;5.00\n'), 'credit.csv'),
+            (BytesIO(b'Amount,Balance\n1,2\n'), 'broken.csv'),
+        ]}
+        resp = self.client.post('/transactionForm', data=data, content_type='multipart/form-data')
+        self.assertEqual(resp.status_code, 302)
+        batch_id = resp.headers['Location'].split('batch_id=')[1]
+
+        batch = self.client.get(f'/api/import/batch/{batch_id}').get_json()
+        self.assertTrue(batch['finished'])
+        self.assertEqual(batch['rows_inserted'], 3)
+        files = {f['filename']: f for f in batch['files']}
+        self.assertEqual(files['everyday.csv']['rows_inserted'], 1)
+        self.assertEqual(files['credit.csv']['rows_inserted'], 2)
+        self.assertEqual(files['broken.csv']['status'], 'failed')
+        self.assertIn('missing required columns', files['broken.csv']['errors'][0])
+
+        with self.app.app_context():
+            coles = Transaction.query.filter_by(description='COLES 12').one()
+            self.assertEqual(coles.category, 'Groceries')
+
+        page = self.client.get(f'/submission?batch_id={batch_id}')
+        self.assertIn(b'credit.csv', page.data)
+
+    def test_recategorization_is_learned_by_next_import(self):
+        self.client.post('/login', data={
+            'email': 't@example.com',
+            'password': 'secret'
+        }, follow_redirects=True)
+
+        upload = lambda day: {'csv_file': (BytesIO(
+            f'Date,Amount,Description\n{day}/05/2025,-18.00,GYM DIRECT DEBIT {day}99\n'.encode()),
+            'transactions.csv')}
+        self.client.post('/transactionForm', data=upload('01'), content_type='multipart/form-data')
+
+        with self.app.app_context():
+            tx = Transaction.query.one()
+            self.assertEqual(tx.category, 'uncategorized')
+            tx_id = tx.id
+
+        resp = self.client.post('/api/update_transaction',
+                                json={'transaction_id': tx_id, 'category': 'Fitness'})
+        self.assertEqual(resp.status_code, 200)
+
+        # next month's line differs only in digits
+        self.client.post('/transactionForm', data=upload('02'), content_type='multipart/form-data')
+        with self.app.app_context():
+            latest = Transaction.query.order_by(Transaction.id.desc()).first()
+            self.assertEqual(latest.description, 'GYM DIRECT DEBIT 0299')
+            self.assertEqual(latest.category, 'Fitness')
+
     def test_create_bill(self):
         # login
         self.client.post(
@@ -0,0 +1,80 @@
+import unittest
+from datetime import date
+from decimal import Decimal
+
+from werkzeug.security import generate_password_hash
+
+from app import create_app, db
+from app.models import ForecastSnapshot, User, Transaction
+from app.snapshots import STANDARD_WINDOWS, precompute
+from config import TestConfig
+
+
+class ForecastSnapshotTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+
+        with self.app.app_context():
+            db.create_all()
+            users = [User(username=name, email=f'{name}@example.com',
+                          password=generate_password_hash('secret'))
+                     for name in ('me', 'pal', 'other')]
+            db.session.add_all(users)
+            db.session.flush()
+            today = date.today()
+            for user in users:
+                db.session.add(Transaction(user_id=user.id, date=today.replace(day=1),
+                                           amount=Decimal('12.50'), category='Groceries',
+                                           type='expense', description='COLES'))
+            db.session.commit()
+            self.uid = users[0].id
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def test_incremental_runs_recompute_only_changed_users(self):
+        with self.app.app_context():
+            stats = precompute()
+            self.assertEqual((stats['users'], stats['snapshots']), (3, 3 * len(STANDARD_WINDOWS)))
+            self.assertEqual(ForecastSnapshot.query.count(), 3 * len(STANDARD_WINDOWS))
+
+            self.assertEqual(precompute()['users'], 0)
+            self.assertEqual(precompute(full=True)['users'], 3)
+
+            db.session.add(Transaction(user_id=self.uid, date=date.today(), amount=Decimal('3.00'),
+                                       category='Coffee', type='expense', description='CAFE'))
+            db.session.commit()
+            stats = precompute()
+            self.assertEqual((stats['users'], stats['snapshots']), (1, len(STANDARD_WINDOWS)))
+
+            # a window without a snapshot makes every user stale for it
+            self.assertEqual(precompute(windows=(6, 36))['users'], 3)
+
+    def test_api_forecast_serves_a_current_snapshot(self):
+        with self.app.app_context():
+            precompute(windows=(12,))
+            snap = db.session.get(ForecastSnapshot, (self.uid, 12, 'linear'))
+            snap.payload = {**snap.payload, 'categories': {'from the snapshot': [1.0] * 6}}
+            db.session.commit()
+
+        client = self.app.test_client()
+        client.post('/login', data={'email': 'me@example.com', 'password': 'secret'})
+        self.assertIn('from the snapshot', client.get('/api/forecast?months=12').get_json()['categories'])
+
+        # new data outdates the snapshot
+        with self.app.app_context():
+            db.session.add(Transaction(user_id=self.uid, date=date.today(), amount=Decimal('3.00'),
+                                       category='Coffee', type='expense', description='CAFE'))
+            db.session.commit()
+        self.assertNotIn('from the snapshot', client.get('/api/forecast?months=12').get_json()['categories'])
+
+    def test_cli_reports_throughput(self):
+        result = self.app.test_cli_runner().invoke(args=['forecast', 'precompute', '--window', '6'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn('Computed 3 snapshots for 3 users', result.output)
+        self.assertIn('users/s', result.output)
+
+
+if __name__ == '__main__':
+    unittest.main()